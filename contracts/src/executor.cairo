@@ -0,0 +1,198 @@
+use starknet::ContractAddress;
+
+// Asset id used for wrapped BTC; any other id is a Rune id
+pub const WRAPPED_BTC: u256 = 0;
+
+// One verified deposit to mint
+#[derive(Copy, Drop, Serde)]
+pub struct MintIntent {
+    pub recipient: ContractAddress,
+    pub asset_id: u256,
+    pub amount: u256,
+    pub bitcoin_tx_hash: felt252,
+}
+
+#[starknet::interface]
+pub trait IExecutor<TContractState> {
+    fn mint_batch(ref self: TContractState, intents: Span<MintIntent>);
+    fn get_balance(self: @TContractState, user: ContractAddress) -> u256;
+    fn get_asset_balance(self: @TContractState, user: ContractAddress, asset_id: u256) -> u256;
+    fn get_total_supply(self: @TContractState, asset_id: u256) -> u256;
+    fn is_claimed(self: @TContractState, bitcoin_tx_hash: felt252) -> bool;
+    fn get_verifier(self: @TContractState) -> ContractAddress;
+    fn get_minter(self: @TContractState) -> ContractAddress;
+    fn set_minter(ref self: TContractState, minter: ContractAddress);
+}
+
+#[starknet::contract]
+pub mod Executor {
+    use starknet::{ContractAddress, get_caller_address, storage::Map};
+    use rift_verifier::verifier::{IVerifierDispatcher, IVerifierDispatcherTrait};
+    use super::{MintIntent, WRAPPED_BTC};
+
+    #[storage]
+    struct Storage {
+        owner: ContractAddress,
+        // Verifier that must have verified every minted deposit
+        verifier: ContractAddress,
+        // Account allowed to submit mint batches (the watcher)
+        minter: ContractAddress,
+        // Balances by (user, asset id)
+        balances: Map<(ContractAddress, u256), u256>,
+        total_supply: Map<u256, u256>,
+        // Track minted Bitcoin transactions to prevent double-claim
+        claimed_transactions: Map<felt252, bool>,
+    }
+
+    #[event]
+    #[derive(Drop, starknet::Event)]
+    pub enum Event {
+        Minted: MintedEvent,
+        BatchMinted: BatchMintedEvent,
+    }
+
+    // One per recipient and asset in a batch, covering all their deposits
+    #[derive(Drop, starknet::Event)]
+    pub struct MintedEvent {
+        #[key]
+        pub recipient: ContractAddress,
+        #[key]
+        pub asset_id: u256,
+        pub amount: u256,
+        pub deposits: u32,
+    }
+
+    #[derive(Drop, starknet::Event)]
+    pub struct BatchMintedEvent {
+        pub deposits: u32,
+        pub recipients: u32,
+    }
+
+    #[constructor]
+    fn constructor(
+        ref self: ContractState,
+        owner: ContractAddress,
+        verifier: ContractAddress,
+        minter: ContractAddress
+    ) {
+        self.owner.write(owner);
+        self.verifier.write(verifier);
+        self.minter.write(minter);
+    }
+
+    #[abi(embed_v0)]
+    impl ExecutorImpl of super::IExecutor<ContractState> {
+        // Intents sorted by (asset_id, recipient) get one balance write per
+        // recipient and one supply write per asset. Unsorted batches are
+        // still minted correctly, just with more writes.
+        fn mint_batch(ref self: ContractState, intents: Span<MintIntent>) {
+            // 1. Only the minter can call
+            assert(get_caller_address() == self.minter.read(), 'Only minter can call');
+            assert(intents.len() > 0, 'Empty batch');
+
+            // 2. One Verifier call covers every deposit in the batch
+            let mut tx_hashes: Array<felt252> = array![];
+            for intent in intents {
+                tx_hashes.append(*intent.bitcoin_tx_hash);
+            };
+            let verifier = IVerifierDispatcher { contract_address: self.verifier.read() };
+            assert(verifier.are_verified(tx_hashes.span()), 'Deposit not verified');
+
+            // 3. Mark deposits claimed and sum amounts per run of equal
+            //    (asset, recipient), writing each run's balance once
+            let first = *intents.at(0);
+            let mut run_recipient = first.recipient;
+            let mut run_asset = first.asset_id;
+            let mut run_amount: u256 = 0;
+            let mut run_deposits: u32 = 0;
+            let mut asset_amount: u256 = 0;
+            let mut recipients: u32 = 0;
+
+            for intent in intents {
+                let intent = *intent;
+                assert(!self.claimed_transactions.read(intent.bitcoin_tx_hash), 'Already claimed');
+                self.claimed_transactions.write(intent.bitcoin_tx_hash, true);
+
+                if intent.recipient != run_recipient || intent.asset_id != run_asset {
+                    self._credit(run_recipient, run_asset, run_amount, run_deposits);
+                    recipients += 1;
+                    run_recipient = intent.recipient;
+                    run_amount = 0;
+                    run_deposits = 0;
+                }
+                if intent.asset_id != run_asset {
+                    self._add_supply(run_asset, asset_amount);
+                    run_asset = intent.asset_id;
+                    asset_amount = 0;
+                }
+
+                run_amount = run_amount + intent.amount;
+                run_deposits += 1;
+                asset_amount = asset_amount + intent.amount;
+            };
+            self._credit(run_recipient, run_asset, run_amount, run_deposits);
+            self._add_supply(run_asset, asset_amount);
+
+            self.emit(Event::BatchMinted(BatchMintedEvent {
+                deposits: intents.len(),
+                recipients: recipients + 1,
+            }));
+        }
+
+        fn get_balance(self: @ContractState, user: ContractAddress) -> u256 {
+            self.balances.read((user, WRAPPED_BTC))
+        }
+
+        fn get_asset_balance(self: @ContractState, user: ContractAddress, asset_id: u256) -> u256 {
+            self.balances.read((user, asset_id))
+        }
+
+        fn get_total_supply(self: @ContractState, asset_id: u256) -> u256 {
+            self.total_supply.read(asset_id)
+        }
+
+        fn is_claimed(self: @ContractState, bitcoin_tx_hash: felt252) -> bool {
+            self.claimed_transactions.read(bitcoin_tx_hash)
+        }
+
+        fn get_verifier(self: @ContractState) -> ContractAddress {
+            self.verifier.read()
+        }
+
+        fn get_minter(self: @ContractState) -> ContractAddress {
+            self.minter.read()
+        }
+
+        fn set_minter(ref self: ContractState, minter: ContractAddress) {
+            assert(self.owner.read() == get_caller_address(), 'Not owner');
+            self.minter.write(minter);
+        }
+    }
+
+    #[generate_trait]
+    impl InternalImpl of InternalTrait {
+        fn _credit(
+            ref self: ContractState,
+            recipient: ContractAddress,
+            asset_id: u256,
+            amount: u256,
+            deposits: u32
+        ) {
+            let key = (recipient, asset_id);
+            let balance = self.balances.read(key);
+            self.balances.write(key, balance + amount);
+
+            self.emit(Event::Minted(MintedEvent {
+                recipient: recipient,
+                asset_id: asset_id,
+                amount: amount,
+                deposits: deposits,
+            }));
+        }
+
+        fn _add_supply(ref self: ContractState, asset_id: u256, amount: u256) {
+            let total = self.total_supply.read(asset_id);
+            self.total_supply.write(asset_id, total + amount);
+        }
+    }
+}
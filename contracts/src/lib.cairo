@@ -1 +1,2 @@
-mod verifier;
+pub mod verifier;
+pub mod executor;
@@ -3,6 +3,7 @@ use starknet::ContractAddress;
 #[starknet::interface]
 pub trait IVerifier<TContractState> {
     fn is_verified(self: @TContractState, tx_hash: felt252) -> bool;
+    fn are_verified(self: @TContractState, tx_hashes: Span<felt252>) -> bool;
     fn get_verification_count(self: @TContractState) -> u64;
     fn get_owner(self: @TContractState) -> ContractAddress;
     fn transfer_ownership(ref self: TContractState, new_owner: ContractAddress);
@@ -53,6 +54,18 @@ pub mod Verifier {
             self.verified_transactions.read(tx_hash)
         }
 
+        // Lets the Executor check a whole mint batch with a single call
+        fn are_verified(self: @ContractState, tx_hashes: Span<felt252>) -> bool {
+            let mut all_verified = true;
+            for tx_hash in tx_hashes {
+                if !self.verified_transactions.read(*tx_hash) {
+                    all_verified = false;
+                    break;
+                }
+            };
+            all_verified
+        }
+
         fn get_verification_count(self: @ContractState) -> u64 {
             self.verification_count.read()
         }
@@ -0,0 +1,218 @@
+use starknet::ContractAddress;
+use snforge_std::{
+    declare, ContractClassTrait, DeclareResultTrait, start_cheat_caller_address, spy_events,
+    EventSpyAssertionsTrait
+};
+use rift_verifier::verifier::{IVerifierDispatcher, IVerifierDispatcherTrait};
+use rift_verifier::executor::{
+    IExecutorDispatcher, IExecutorDispatcherTrait, MintIntent, WRAPPED_BTC, Executor
+};
+
+const RUNE: u256 = 840000;
+
+fn owner() -> ContractAddress {
+    'owner'.try_into().unwrap()
+}
+
+fn minter() -> ContractAddress {
+    'minter'.try_into().unwrap()
+}
+
+fn alice() -> ContractAddress {
+    'alice'.try_into().unwrap()
+}
+
+fn bob() -> ContractAddress {
+    'bob'.try_into().unwrap()
+}
+
+// Deploys a Verifier and an Executor that mints for `minter`
+fn setup() -> (IVerifierDispatcher, IExecutorDispatcher) {
+    let verifier_class = declare("Verifier").unwrap().contract_class();
+    let (verifier_address, _) = verifier_class.deploy(@array![owner().into()]).unwrap();
+
+    let executor_class = declare("Executor").unwrap().contract_class();
+    let calldata = array![owner().into(), verifier_address.into(), minter().into()];
+    let (executor_address, _) = executor_class.deploy(@calldata).unwrap();
+    start_cheat_caller_address(executor_address, minter());
+
+    (
+        IVerifierDispatcher { contract_address: verifier_address },
+        IExecutorDispatcher { contract_address: executor_address }
+    )
+}
+
+fn verify(verifier: IVerifierDispatcher, tx_hash: felt252) {
+    verifier.verify_secp256k1_signature(tx_hash, 1, 2, 3, 4, 5);
+}
+
+fn deposit(
+    verifier: IVerifierDispatcher,
+    tx_hash: felt252,
+    recipient: ContractAddress,
+    asset_id: u256,
+    amount: u256
+) -> MintIntent {
+    verify(verifier, tx_hash);
+    MintIntent { recipient, asset_id, amount, bitcoin_tx_hash: tx_hash }
+}
+
+#[test]
+fn test_runs_credit_each_recipient_once() {
+    let (verifier, executor) = setup();
+    let intents = array![
+        deposit(verifier, 1, alice(), WRAPPED_BTC, 100),
+        deposit(verifier, 2, alice(), WRAPPED_BTC, 200),
+        deposit(verifier, 3, bob(), WRAPPED_BTC, 50),
+    ];
+    let mut spy = spy_events();
+
+    executor.mint_batch(intents.span());
+
+    assert(executor.get_balance(alice()) == 300, 'alice balance');
+    assert(executor.get_balance(bob()) == 50, 'bob balance');
+    assert(executor.get_total_supply(WRAPPED_BTC) == 350, 'supply');
+    assert(executor.is_claimed(1) && executor.is_claimed(2) && executor.is_claimed(3), 'claimed');
+    spy
+        .assert_emitted(
+            @array![
+                (
+                    executor.contract_address,
+                    Executor::Event::Minted(
+                        Executor::MintedEvent {
+                            recipient: alice(), asset_id: WRAPPED_BTC, amount: 300, deposits: 2
+                        }
+                    )
+                ),
+                (
+                    executor.contract_address,
+                    Executor::Event::Minted(
+                        Executor::MintedEvent {
+                            recipient: bob(), asset_id: WRAPPED_BTC, amount: 50, deposits: 1
+                        }
+                    )
+                ),
+                (
+                    executor.contract_address,
+                    Executor::Event::BatchMinted(
+                        Executor::BatchMintedEvent { deposits: 3, recipients: 2 }
+                    )
+                ),
+            ]
+        );
+}
+
+#[test]
+fn test_asset_change_splits_supply_and_balances() {
+    let (verifier, executor) = setup();
+    // Same recipient on both sides of the asset boundary
+    let intents = array![
+        deposit(verifier, 1, alice(), WRAPPED_BTC, 100),
+        deposit(verifier, 2, bob(), WRAPPED_BTC, 10),
+        deposit(verifier, 3, bob(), RUNE, 7),
+        deposit(verifier, 4, bob(), RUNE, 3),
+    ];
+
+    executor.mint_batch(intents.span());
+
+    assert(executor.get_total_supply(WRAPPED_BTC) == 110, 'btc supply');
+    assert(executor.get_total_supply(RUNE) == 10, 'rune supply');
+    assert(executor.get_asset_balance(bob(), WRAPPED_BTC) == 10, 'bob btc');
+    assert(executor.get_asset_balance(bob(), RUNE) == 10, 'bob rune');
+    assert(executor.get_asset_balance(alice(), RUNE) == 0, 'alice rune');
+}
+
+#[test]
+fn test_unsorted_batch_mints_the_same_totals() {
+    let (verifier, executor) = setup();
+    let intents = array![
+        deposit(verifier, 1, bob(), RUNE, 7),
+        deposit(verifier, 2, alice(), WRAPPED_BTC, 100),
+        deposit(verifier, 3, bob(), WRAPPED_BTC, 10),
+        deposit(verifier, 4, alice(), WRAPPED_BTC, 1),
+        deposit(verifier, 5, bob(), RUNE, 3),
+    ];
+
+    executor.mint_batch(intents.span());
+
+    assert(executor.get_balance(alice()) == 101, 'alice btc');
+    assert(executor.get_balance(bob()) == 10, 'bob btc');
+    assert(executor.get_asset_balance(bob(), RUNE) == 10, 'bob rune');
+    assert(executor.get_total_supply(WRAPPED_BTC) == 111, 'btc supply');
+    assert(executor.get_total_supply(RUNE) == 10, 'rune supply');
+}
+
+#[test]
+#[should_panic(expected: 'Already claimed')]
+fn test_duplicate_tx_hash_in_one_batch() {
+    let (verifier, executor) = setup();
+    let first = deposit(verifier, 1, alice(), WRAPPED_BTC, 100);
+    executor.mint_batch(array![first, first].span());
+}
+
+#[test]
+#[should_panic(expected: 'Already claimed')]
+fn test_deposit_claimed_by_an_earlier_batch() {
+    let (verifier, executor) = setup();
+    let first = deposit(verifier, 1, alice(), WRAPPED_BTC, 100);
+    executor.mint_batch(array![first].span());
+    executor.mint_batch(array![first].span());
+}
+
+#[test]
+#[should_panic(expected: 'Deposit not verified')]
+fn test_unverified_deposit_fails_the_batch() {
+    let (verifier, executor) = setup();
+    let unverified = MintIntent {
+        recipient: bob(), asset_id: WRAPPED_BTC, amount: 5, bitcoin_tx_hash: 2
+    };
+    executor.mint_batch(array![deposit(verifier, 1, alice(), WRAPPED_BTC, 100), unverified].span());
+}
+
+#[test]
+#[should_panic(expected: 'Empty batch')]
+fn test_empty_batch() {
+    let (_, executor) = setup();
+    executor.mint_batch(array![].span());
+}
+
+#[test]
+#[should_panic(expected: 'Only minter can call')]
+fn test_only_minter_can_mint() {
+    let (verifier, executor) = setup();
+    start_cheat_caller_address(executor.contract_address, alice());
+    executor.mint_batch(array![deposit(verifier, 1, alice(), WRAPPED_BTC, 100)].span());
+}
+
+// Steps for batch size 1 vs 16. Compare with:
+//     snforge test bench_ --detailed-resources
+// Both mint the same 16 deposits for 4 recipients; only the batching differs.
+// Calls within one test share a transaction, so the per-transaction fee the
+// one-per-call case pays on chain is not counted here.
+const BENCH_DEPOSITS: u32 = 16;
+
+fn bench_intents(verifier: IVerifierDispatcher) -> Array<MintIntent> {
+    let recipients = array![alice(), bob(), owner(), minter()];
+    let mut intents = array![];
+    for i in 0..BENCH_DEPOSITS {
+        let recipient = *recipients.at(i / 4);
+        intents.append(deposit(verifier, (i + 1).into(), recipient, WRAPPED_BTC, 1000));
+    };
+    intents
+}
+
+#[test]
+fn bench_mint_one_per_call() {
+    let (verifier, executor) = setup();
+    for intent in bench_intents(verifier) {
+        executor.mint_batch(array![intent].span());
+    };
+    assert(executor.get_total_supply(WRAPPED_BTC) == 16000, 'supply');
+}
+
+#[test]
+fn bench_mint_one_batch() {
+    let (verifier, executor) = setup();
+    executor.mint_batch(bench_intents(verifier).span());
+    assert(executor.get_total_supply(WRAPPED_BTC) == 16000, 'supply');
+}
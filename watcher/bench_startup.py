@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the watcher and the RPC bridge.
+
+Every sample runs in a fresh interpreter so module caches don't carry
+over between runs. Each scenario is measured twice: the way it runs now
+("after"), and an approximation of the old eager startup ("before").
+
+The "before" rows do not run the old code. They import the current modules
+with the imports those modules used to do at load (bitcoinrpc, aiohttp,
+starknet.py) added in front, and for the ABI row read the ABI from the full
+artifact and parse it with starknet.py's stock type parser. Neither column
+includes RPC calls.
+
+Usage:
+    python bench_startup.py [samples]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+WATCHER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Code run before the timer starts in every sample
+PRELUDE = f"import sys, time; sys.path.insert(0, {WATCHER_DIR!r})"
+
+SCENARIOS = [
+    (
+        "import watcher",
+        "import watcher",
+        "import bitcoinrpc.authproxy, watcher",
+    ),
+    (
+        "import rpc_bridge",
+        "import rpc_bridge",
+        "import aiohttp, starknet_py.contract, starknet_py.net.full_node_client, "
+        "starknet_py.net.account.account, rpc_bridge",
+    ),
+    (
+        "load Verifier ABI",
+        "import rpc_bridge as rb; "
+        "from starknet_py.net.full_node_client import FullNodeClient; "
+        "rb.contract_from_abi('0x1', rb.load_abi_cache()['abi'], "
+        "FullNodeClient(node_url=rb.KATANA_RPC_URL))",
+        "import json, rpc_bridge as rb; "
+        "from starknet_py.contract import Contract; "
+        "from starknet_py.net.full_node_client import FullNodeClient; "
+        "Contract(address='0x1', abi=json.load(open(rb.VERIFIER_CONTRACT_ARTIFACT))['abi'], "
+        "provider=FullNodeClient(node_url=rb.KATANA_RPC_URL))",
+    ),
+]
+
+
+def time_snippet(code: str) -> float:
+    """Run ``code`` in a new interpreter and return its duration in ms."""
+    script = (
+        f"{PRELUDE}\n"
+        "_start = time.perf_counter()\n"
+        f"{code}\n"
+        "print(time.perf_counter() - _start)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True, text=True, cwd=WATCHER_DIR
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout.strip().splitlines()[-1]) * 1000
+
+
+def median_ms(code: str, samples: int) -> float:
+    return statistics.median(time_snippet(code) for _ in range(samples))
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("Rift startup benchmark")
+    print("=" * 64)
+    print(f"Python {sys.version.split()[0]}, {samples} fresh-interpreter samples per row (median)")
+    print()
+
+    # Make sure the ABI cache exists so the lazy row measures a warm cache
+    time_snippet(SCENARIOS[2][1])
+
+    interpreter_ms = statistics.median(
+        _interpreter_start() for _ in range(samples)
+    )
+    print(f"{'interpreter start':<22}{interpreter_ms:>10.1f} ms")
+    print()
+    print(f"{'scenario':<22}{'before':>10}{'after':>12}{'change':>12}")
+    print("-" * 64)
+    for name, lazy_code, eager_code in SCENARIOS:
+        try:
+            before = median_ms(eager_code, samples)
+            after = median_ms(lazy_code, samples)
+        except RuntimeError as e:
+            print(f"{name:<22}  skipped: {e}")
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:<22}{before:>8.1f} ms{after:>9.1f} ms{change:>+11.1f}%")
+    print()
+    print("'before' is approximated: today's modules with the old eager imports")
+    print("prepended, and the ABI read from the full artifact and parsed by stock")
+    print("starknet.py. Not measured: RPC calls. Loading a contract now costs")
+    print("starknet_getClassHashAt; without a matching artifact it also fetches the")
+    print("class (starknet_getClass).")
+
+
+def _interpreter_start() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    main()
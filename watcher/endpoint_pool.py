@@ -0,0 +1,399 @@
+"""
+Endpoint Pool Module - Failover and load balancing across RPC nodes
+
+Both the Bitcoin and Starknet clients can be pointed at several nodes.
+The pool keeps a latency-weighted health score per node and routes each
+request to the fastest healthy one. Reads can be hedged: if the first node
+is slow to answer, the same request is sent to the next node and whichever
+answers first wins. Writes are never hedged; instead each attempt gets a
+short timeout, so a node that accepts connections but stalls is skipped.
+Nodes that keep failing are taken out of rotation by a circuit breaker and
+are brought back gradually once they respond again.
+
+A request still waiting on a node counts against it: the node scores at
+least as slow as the oldest unanswered attempt, so a node that hangs loses
+its place after the first stalled request rather than after the circuit
+breaker trips.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+# asyncio and concurrent.futures are imported by the call paths that need
+# them, keeping this module cheap to import for the watcher
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+# Circuit breaker and hedging defaults
+ENDPOINT_FAILURE_THRESHOLD = int(os.getenv("ENDPOINT_FAILURE_THRESHOLD", "3"))
+ENDPOINT_OPEN_SECONDS = float(os.getenv("ENDPOINT_OPEN_SECONDS", "10"))
+ENDPOINT_HEDGE_MIN_DELAY = float(os.getenv("ENDPOINT_HEDGE_MIN_DELAY", "0.05"))
+# Per-attempt limit for writes (seconds); a timeout counts as a node error
+ENDPOINT_WRITE_TIMEOUT = float(os.getenv("ENDPOINT_WRITE_TIMEOUT", "10"))
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+RECOVERING = "recovering"
+
+# Share of traffic a node gets when it leaves the open state; doubles per success
+RECOVERY_START_WEIGHT = 0.125
+
+# Smoothing factor for the latency moving average
+LATENCY_ALPHA = 0.2
+
+# Hedge threads per node; a node with this many unanswered attempts is not
+# sent more hedged reads, so hung attempts can't take the whole executor
+HEDGE_THREADS_PER_ENDPOINT = 2
+
+
+def parse_urls(urls) -> List[str]:
+    """Accept a list of URLs or a comma-separated string of them."""
+    if isinstance(urls, str):
+        urls = urls.split(",")
+    return [url.strip() for url in urls if url and url.strip()]
+
+
+class Endpoint:
+    """Health state for a single RPC node."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.weight = 1.0
+        # Start times of attempts that have not returned yet, by attempt id
+        self.pending: Dict[int, float] = {}
+
+    def available(self, now: float, open_seconds: float) -> bool:
+        if self.state == OPEN and now - self.opened_at >= open_seconds:
+            # Cool-down elapsed: let a trickle of traffic through
+            self.state = RECOVERING
+            self.weight = RECOVERY_START_WEIGHT
+        return self.state != OPEN
+
+    def score(self, now: float) -> float:
+        """
+        Expected latency; lower is better.
+
+        An attempt that hasn't returned counts as taking at least as long
+        as it has been running.
+        """
+        latency = self.latency if self.latency is not None else 0.0
+        if self.pending:
+            latency = max(latency, now - min(self.pending.values()))
+        return latency
+
+    def __repr__(self) -> str:
+        latency = f"{self.latency * 1000:.0f}ms" if self.latency is not None else "n/a"
+        return f"Endpoint({self.url}, {self.state}, latency={latency}, weight={self.weight:g})"
+
+
+class NoHealthyEndpoint(RuntimeError):
+    """Raised when every endpoint in the pool is behind an open circuit breaker."""
+
+
+class EndpointPool:
+    """
+    Routes requests across several RPC endpoints.
+
+    ``is_node_error`` decides whether an exception means the node itself is
+    unhealthy (connection refused, timeout, HTTP 5xx) or whether the request
+    was simply invalid. Only node errors count against an endpoint and
+    trigger failover; other errors are raised to the caller straight away.
+    """
+
+    def __init__(
+        self,
+        urls,
+        failure_threshold: int = ENDPOINT_FAILURE_THRESHOLD,
+        open_seconds: float = ENDPOINT_OPEN_SECONDS,
+        hedge_min_delay: float = ENDPOINT_HEDGE_MIN_DELAY,
+        is_node_error: Callable[[BaseException], bool] = lambda e: True,
+        write_timeout: float = ENDPOINT_WRITE_TIMEOUT
+    ):
+        urls = parse_urls(urls)
+        if not urls:
+            raise ValueError("EndpointPool needs at least one URL")
+
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.hedge_min_delay = hedge_min_delay
+        self.is_node_error = is_node_error
+        self.write_timeout = write_timeout
+        self._lock = threading.Lock()
+        self._executor: Optional["ThreadPoolExecutor"] = None
+        self._attempts = 0
+
+    @property
+    def primary_url(self) -> str:
+        return self.endpoints[0].url
+
+    def ranked(self) -> List[Endpoint]:
+        """
+        Available endpoints, fastest first.
+
+        Nodes that have answered before come ahead of nodes not measured
+        yet. A recovering node leads the list for a share of requests equal
+        to its weight, so it takes more traffic with every success, and is
+        otherwise kept as a last resort.
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [ep for ep in self.endpoints if ep.available(now, self.open_seconds)]
+            # sorted() is stable, so nodes without a latency yet keep configured order
+            healthy = sorted(
+                (ep for ep in candidates if ep.state == CLOSED),
+                key=lambda ep: (ep.latency is None, ep.score(now))
+            )
+        recovering = [ep for ep in candidates if ep.state == RECOVERING]
+        probes = [ep for ep in recovering if random.random() < ep.weight]
+        return probes + healthy + [ep for ep in recovering if ep not in probes]
+
+    def begin(self, endpoint: Endpoint) -> int:
+        """Note an attempt starting on ``endpoint``; pass the id to ``end()``."""
+        with self._lock:
+            self._attempts += 1
+            endpoint.pending[self._attempts] = time.monotonic()
+            return self._attempts
+
+    def end(self, endpoint: Endpoint, attempt_id: int) -> float:
+        """Note an attempt returning, however it ended. Returns its duration."""
+        with self._lock:
+            return time.monotonic() - endpoint.pending.pop(attempt_id)
+
+    def record_success(self, endpoint: Endpoint, latency: float, answered: bool = True) -> None:
+        """
+        Fold ``latency`` into the node's average.
+
+        ``answered=False`` records a lower bound only (an attempt dropped
+        after another node won), leaving the breaker state alone.
+        """
+        with self._lock:
+            if endpoint.latency is None:
+                endpoint.latency = latency
+            elif answered or latency > endpoint.latency:
+                endpoint.latency += LATENCY_ALPHA * (latency - endpoint.latency)
+            if not answered:
+                return
+            endpoint.failures = 0
+            if endpoint.state == RECOVERING:
+                endpoint.weight = min(1.0, endpoint.weight * 2)
+                if endpoint.weight >= 1.0:
+                    endpoint.state = CLOSED
+                    print(f"[*] RPC endpoint recovered: {endpoint.url}", file=sys.stderr)
+
+    def record_failure(self, endpoint: Endpoint, error: BaseException) -> None:
+        with self._lock:
+            endpoint.failures += 1
+            # A recovering node gets no second chance within the same probe
+            if endpoint.state == RECOVERING or endpoint.failures >= self.failure_threshold:
+                if endpoint.state != OPEN:
+                    print(f"[!] RPC endpoint unhealthy, pausing {endpoint.url}: {error}", file=sys.stderr)
+                endpoint.state = OPEN
+                endpoint.opened_at = time.monotonic()
+                endpoint.weight = RECOVERY_START_WEIGHT
+
+    def hedge_delay(self, endpoint: Endpoint) -> float:
+        """How long to wait on ``endpoint`` before hedging to the next node."""
+        if endpoint.latency is None:
+            return self.hedge_min_delay
+        return max(self.hedge_min_delay, 2 * endpoint.latency)
+
+    def _candidates(self) -> List[Endpoint]:
+        candidates = self.ranked()
+        if not candidates:
+            raise NoHealthyEndpoint(
+                "No healthy RPC endpoint available: " + ", ".join(ep.url for ep in self.endpoints)
+            )
+        return candidates
+
+    # ------------------------------------------------------------------
+    # Blocking API (Bitcoin RPC)
+    # ------------------------------------------------------------------
+
+    def call(self, fn: Callable[[str], Any], hedge: bool = False) -> Any:
+        """
+        Run ``fn(url)`` against the best endpoint, failing over on node errors.
+
+        Args:
+            fn: Blocking function performing the request against a URL
+            hedge: Send the request to a second node if the first is slow.
+                   Only use for reads.
+        """
+        candidates = self._candidates()
+        if hedge:
+            # Nodes whose hedge threads are all stuck wait out this request
+            free = [ep for ep in candidates if len(ep.pending) < HEDGE_THREADS_PER_ENDPOINT]
+            if len(free) > 1:
+                return self._call_hedged(fn, free)
+            if free:
+                candidates = free + [ep for ep in candidates if ep not in free]
+
+        last_error: Optional[BaseException] = None
+        for endpoint in candidates:
+            attempt_id = self.begin(endpoint)
+            try:
+                result = fn(endpoint.url)
+            except Exception as e:
+                self.end(endpoint, attempt_id)
+                if not self.is_node_error(e):
+                    raise
+                self.record_failure(endpoint, e)
+                last_error = e
+                continue
+            self.record_success(endpoint, self.end(endpoint, attempt_id))
+            return result
+        raise last_error
+
+    def _call_hedged(self, fn: Callable[[str], Any], candidates: Sequence[Endpoint]) -> Any:
+        from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=2 * len(self.endpoints), thread_name_prefix="rpc-hedge"
+            )
+
+        def attempt(endpoint: Endpoint, attempt_id: int):
+            try:
+                result = fn(endpoint.url)
+            except Exception as e:
+                self.end(endpoint, attempt_id)
+                if self.is_node_error(e):
+                    self.record_failure(endpoint, e)
+                raise
+            self.record_success(endpoint, self.end(endpoint, attempt_id))
+            return result
+
+        remaining = list(candidates)
+        in_flight = {}
+        last_error: Optional[BaseException] = None
+        while remaining or in_flight:
+            if remaining:
+                endpoint = remaining.pop(0)
+                # Counted from submission, so a queued attempt also weighs on the node
+                in_flight[self._executor.submit(attempt, endpoint, self.begin(endpoint))] = endpoint
+                timeout = self.hedge_delay(endpoint) if remaining else None
+            else:
+                timeout = None
+
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.pop(future)
+                error = future.exception()
+                if error is None:
+                    # Slower duplicates finish in the background and only update stats
+                    return future.result()
+                if not self.is_node_error(error):
+                    raise error
+                last_error = error
+        raise last_error
+
+    # ------------------------------------------------------------------
+    # Async API (Starknet RPC)
+    # ------------------------------------------------------------------
+
+    async def call_async(
+        self,
+        fn: Callable[[str], Awaitable[Any]],
+        hedge: bool = False,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Await ``fn(url)`` against the best endpoint, failing over on node errors.
+
+        Args:
+            fn: Coroutine function performing the request against a URL
+            hedge: Send the request to a second node if the first is slow.
+                   Only use for reads.
+            timeout: Seconds each unhedged attempt may take; running out
+                     counts against the node and moves on to the next one
+        """
+        import asyncio
+
+        candidates = self._candidates()
+        if hedge and len(candidates) > 1:
+            return await self._call_hedged_async(fn, candidates)
+
+        last_error: Optional[BaseException] = None
+        for endpoint in candidates:
+            attempt_id = self.begin(endpoint)
+            try:
+                result = await asyncio.wait_for(fn(endpoint.url), timeout=timeout)
+            except Exception as e:
+                self.end(endpoint, attempt_id)
+                if isinstance(e, asyncio.TimeoutError):
+                    e = asyncio.TimeoutError(f"No answer from {endpoint.url} within {timeout}s")
+                elif not self.is_node_error(e):
+                    raise
+                self.record_failure(endpoint, e)
+                last_error = e
+                continue
+            except BaseException:
+                self.end(endpoint, attempt_id)
+                raise
+            self.record_success(endpoint, self.end(endpoint, attempt_id))
+            return result
+        raise last_error
+
+    async def _call_hedged_async(
+        self,
+        fn: Callable[[str], Awaitable[Any]],
+        candidates: Sequence[Endpoint]
+    ) -> Any:
+        import asyncio
+
+        async def attempt(endpoint: Endpoint):
+            attempt_id = self.begin(endpoint)
+            try:
+                result = await fn(endpoint.url)
+            except asyncio.CancelledError:
+                # Lost the race: it took at least this long, so count that
+                self.record_success(endpoint, self.end(endpoint, attempt_id), answered=False)
+                raise
+            except Exception as e:
+                self.end(endpoint, attempt_id)
+                if self.is_node_error(e):
+                    self.record_failure(endpoint, e)
+                raise
+            self.record_success(endpoint, self.end(endpoint, attempt_id))
+            return result
+
+        remaining = list(candidates)
+        in_flight = set()
+        last_error: Optional[BaseException] = None
+        try:
+            while remaining or in_flight:
+                if remaining:
+                    endpoint = remaining.pop(0)
+                    in_flight.add(asyncio.ensure_future(attempt(endpoint)))
+                    timeout = self.hedge_delay(endpoint) if remaining else None
+                else:
+                    timeout = None
+
+                done, in_flight = await asyncio.wait(
+                    in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                winner = None
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        winner = winner or task
+                    elif not self.is_node_error(error):
+                        raise error
+                    else:
+                        last_error = error
+                if winner is not None:
+                    return winner.result()
+            raise last_error
+        finally:
+            # Drop the slower duplicates; the winner already answered
+            for task in in_flight:
+                task.cancel()
@@ -0,0 +1,259 @@
+"""
+Event Log Module - Structured NDJSON event stream for the watcher
+
+Detections, submissions and confirmations are emitted as one JSON object
+per line. Records are queued in memory and written by a background thread
+in batches, so the polling loop never waits on stdout, disk or network.
+When the queue is full new records are dropped and counted rather than
+blocking the caller.
+
+Sinks are configured with a comma-separated spec, e.g.
+``stdout,file:/var/log/rift/events.ndjson,udp:127.0.0.1:9999``.
+"""
+
+import json
+import os
+import queue
+import random
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Event stream configuration
+RIFT_EVENT_SINKS = os.getenv("RIFT_EVENT_SINKS", "stdout")
+RIFT_EVENT_QUEUE_SIZE = int(os.getenv("RIFT_EVENT_QUEUE_SIZE", "10000"))
+RIFT_EVENT_FLUSH_INTERVAL = float(os.getenv("RIFT_EVENT_FLUSH_INTERVAL", "0.5"))
+RIFT_EVENT_BATCH_SIZE = int(os.getenv("RIFT_EVENT_BATCH_SIZE", "256"))
+
+# Raw transaction payloads: fraction of records that carry one, and its cap
+RIFT_EVENT_PAYLOAD_SAMPLE_RATE = float(os.getenv("RIFT_EVENT_PAYLOAD_SAMPLE_RATE", "1.0"))
+RIFT_EVENT_PAYLOAD_MAX_CHARS = int(os.getenv("RIFT_EVENT_PAYLOAD_MAX_CHARS", "512"))
+
+# File rotation
+RIFT_EVENT_FILE_MAX_BYTES = int(os.getenv("RIFT_EVENT_FILE_MAX_BYTES", str(64 * 1024 * 1024)))
+RIFT_EVENT_FILE_BACKUPS = int(os.getenv("RIFT_EVENT_FILE_BACKUPS", "5"))
+
+# Largest UDP datagram we send; longer records are cut at this size
+UDP_MAX_DATAGRAM = 65000
+
+
+class StdoutSink:
+    """Writes records to standard output."""
+
+    def write_batch(self, lines: List[str]) -> None:
+        sys.stdout.write("".join(lines))
+        sys.stdout.flush()
+
+    def close(self) -> None:
+        pass
+
+
+class FileSink:
+    """Appends records to a file, rotating it once it grows past ``max_bytes``."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = RIFT_EVENT_FILE_MAX_BYTES,
+        backup_count: int = RIFT_EVENT_FILE_BACKUPS
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write_batch(self, lines: List[str]) -> None:
+        self._file.write("".join(lines))
+        self._file.flush()
+        if self.max_bytes and self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        # events.ndjson -> events.ndjson.1 -> events.ndjson.2 ...
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class UdpSink:
+    """Sends each record as a single UDP datagram."""
+
+    def __init__(self, host: str, port: int):
+        self.address = (host, port)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def write_batch(self, lines: List[str]) -> None:
+        for line in lines:
+            try:
+                self._socket.sendto(line.encode("utf-8")[:UDP_MAX_DATAGRAM], self.address)
+            except OSError:
+                # Nobody listening (or buffer full); UDP delivery is best effort
+                pass
+
+    def close(self) -> None:
+        self._socket.close()
+
+
+def create_sink(spec: str):
+    """
+    Build a sink from its spec string.
+
+    Args:
+        spec: ``stdout``, ``file:<path>`` or ``udp:<host>:<port>``
+    """
+    kind, _, target = spec.strip().partition(":")
+    if kind == "stdout":
+        return StdoutSink()
+    if kind == "file" and target:
+        return FileSink(target)
+    if kind == "udp" and target:
+        host, _, port = target.rpartition(":")
+        return UdpSink(host or "127.0.0.1", int(port))
+    raise ValueError(f"Unknown event sink: {spec!r}")
+
+
+class EventLog:
+    """
+    Non-blocking NDJSON event stream.
+
+    ``emit`` only enqueues a record; a daemon thread batches queued records
+    and hands them to every sink. Records that don't fit in the queue are
+    counted in ``dropped``. ``emit`` may be called from any thread.
+    """
+
+    def __init__(
+        self,
+        sinks: List[Any],
+        queue_size: int = RIFT_EVENT_QUEUE_SIZE,
+        flush_interval: float = RIFT_EVENT_FLUSH_INTERVAL,
+        batch_size: int = RIFT_EVENT_BATCH_SIZE,
+        payload_sample_rate: float = RIFT_EVENT_PAYLOAD_SAMPLE_RATE,
+        payload_max_chars: int = RIFT_EVENT_PAYLOAD_MAX_CHARS
+    ):
+        self.sinks = sinks
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.payload_sample_rate = payload_sample_rate
+        self.payload_max_chars = payload_max_chars
+        self.emitted = 0
+        self.dropped = 0
+        # emit() runs on the polling thread and the bridge loop alike
+        self._counter_lock = threading.Lock()
+
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def from_spec(cls, spec: str = RIFT_EVENT_SINKS, **kwargs) -> "EventLog":
+        """Create an EventLog from a comma-separated sink spec."""
+        sinks = [create_sink(part) for part in spec.split(",") if part.strip()]
+        return cls(sinks, **kwargs)
+
+    def emit(self, event: str, **fields: Any) -> bool:
+        """
+        Queue a record without blocking.
+
+        Args:
+            event: Record type (e.g. ``detection``, ``submission``)
+            **fields: JSON-serializable record fields
+
+        Returns:
+            True if queued, False if the record was dropped
+        """
+        if self._closed:
+            return False
+        record = {"ts": round(time.time(), 6), "event": event}
+        record.update(fields)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+            return False
+        with self._counter_lock:
+            self.emitted += 1
+        return True
+
+    def payload(self, data: str) -> Optional[str]:
+        """
+        Apply payload sampling and truncation to a raw hex string.
+
+        Returns None for records outside the sample, otherwise the data cut
+        to ``payload_max_chars`` (0 means no limit).
+        """
+        if self.payload_sample_rate < 1.0 and random.random() >= self.payload_sample_rate:
+            return None
+        if self.payload_max_chars and len(data) > self.payload_max_chars:
+            return data[:self.payload_max_chars]
+        return data
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Flush whatever is queued and stop the writer thread.
+
+        Args:
+            timeout: Seconds to wait for the writer in total. If a sink is
+                     stuck past that, records still queued are abandoned and
+                     the sinks are left open for the stuck writer.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        try:
+            # The writer frees room as it drains the queue
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._writer.join(max(0.0, deadline - time.monotonic()))
+        if self._writer.is_alive():
+            print(f"[!] Event log writer did not finish within {timeout}s; "
+                  f"{self._queue.qsize()} records not written", file=sys.stderr)
+            return
+        for sink in self.sinks:
+            sink.close()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    record = self._queue.get(timeout=max(remaining, 0)) if remaining > 0 \
+                        else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        lines = [json.dumps(record, separators=(",", ":"), default=str) + "\n" for record in batch]
+        for sink in self.sinks:
+            try:
+                sink.write_batch(lines)
+            except Exception as e:
+                # A broken sink must not take the writer (or the others) down
+                print(f"[!] Event sink {type(sink).__name__} failed: {e}", file=sys.stderr)
@@ -0,0 +1,558 @@
+"""
+Mint Batcher Module - Batched Executor minting driven by Verifier events
+
+Each deposit carries a mint intent in its OP_RETURN payload. The intent is
+registered here when the deposit is sent to the Verifier, and waits until
+the Verifier emits ``SignatureVerified`` for it. Verified intents are then
+minted together with ``Executor.mint_batch``. A batch is sent once it holds
+``max_batch_size`` deposits, or once its oldest deposit has waited
+``max_delay`` seconds, whichever comes first.
+
+A batch costs one transaction, one Verifier call and one balance write per
+recipient. Minting deposits one by one costs all three per deposit. L2
+execution resources from every batch receipt are summed in ``stats``, so
+the cost per minted deposit can be compared across batch sizes.
+``MINT_BATCH_SIZE=1`` reproduces per-deposit minting.
+
+Only one batch is in flight at a time. Deposits verified in the meantime
+queue up, so batches grow under burst load.
+
+Pending intents and the event cursor are kept in a SQLite ``MintStore``, so
+a crash between ``SignatureVerified`` and ``mint_batch`` doesn't lose the
+deposit. On startup the batcher reloads them, rescans Verifier events from
+the stored cursor and drops anything ``Executor.is_claimed`` reports as
+already minted. Instances sharing a store take over the pending intents of
+instances that left.
+
+A deposit is only given up on when a batch holding just that deposit
+reverts on chain and the Executor hasn't claimed it. Batches that fail any
+other way (nodes down, fee estimation, nonce or RPC errors) are split the
+same way, and single deposits go back in the queue and are retried with a
+growing delay.
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from endpoint_pool import NoHealthyEndpoint
+from rpc_bridge import FELT_TX_HASH_MODULUS, TX_ACCEPTED, TX_REVERTED
+
+if TYPE_CHECKING:
+    from rpc_bridge import RpcBridge
+
+# Batching bounds and event polling (seconds)
+MINT_BATCH_SIZE = int(os.getenv("MINT_BATCH_SIZE", "64"))
+MINT_BATCH_MAX_DELAY = float(os.getenv("MINT_BATCH_MAX_DELAY", "2.0"))
+MINT_EVENT_POLL_INTERVAL = float(os.getenv("MINT_EVENT_POLL_INTERVAL", "1.0"))
+# Longest wait before retrying a batch that could not be sent (seconds)
+MINT_RETRY_MAX_DELAY = float(os.getenv("MINT_RETRY_MAX_DELAY", "60"))
+
+# Store owner for a watcher that runs alone
+MINT_STORE_OWNER = "local"
+
+MINT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mint_intents (
+    bitcoin_tx_hash TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    asset_id TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    verified INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mint_intents_owner ON mint_intents (owner);
+CREATE TABLE IF NOT EXISTS mint_cursors (
+    owner TEXT PRIMARY KEY,
+    next_block INTEGER NOT NULL
+);
+"""
+
+# OP_RETURN payload after the RIFT tag:
+#   action (1 byte) | recipient (32 bytes) | amount (8 bytes, big-endian)
+#   | rune id (16 bytes, mint_runes only)
+RIFT_HEX_TAG = "52494654"
+ACTION_MINT_BTC = "01"
+ACTION_MINT_RUNES = "02"
+
+# Executor asset id for wrapped BTC; any other id is a Rune id
+WRAPPED_BTC = 0
+
+# Starknet addresses are below 2**251
+ADDRESS_BOUND = 2 ** 251
+
+
+def _node_unavailable(error: BaseException) -> bool:
+    """Whether a submission failed because no node could take it, not because it was invalid."""
+    import aiohttp
+    from starknet_py.net.client_errors import ClientError
+
+    if isinstance(error, ClientError):
+        # HTTP failures carry the status as a string code
+        return not isinstance(error.code, int)
+    return isinstance(error, (NoHealthyEndpoint, aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class MintIntent(NamedTuple):
+    """One deposit to mint, in the shape of the Executor's MintIntent struct."""
+
+    recipient: int
+    asset_id: int
+    amount: int
+    bitcoin_tx_hash: int
+
+
+def parse_mint_intent(op_return_data: str, tx_hash: int) -> Optional[MintIntent]:
+    """
+    Parse the mint intent carried in a deposit's OP_RETURN data.
+
+    Args:
+        op_return_data: OP_RETURN payload (hex string)
+        tx_hash: Bitcoin transaction ID as an integer
+
+    Returns:
+        The intent, or None if the payload isn't a well-formed mint
+    """
+    data = op_return_data.lower()
+    start = data.find(RIFT_HEX_TAG)
+    if start < 0:
+        return None
+    data = data[start + len(RIFT_HEX_TAG):]
+
+    action = data[0:2]
+    if action not in (ACTION_MINT_BTC, ACTION_MINT_RUNES):
+        return None
+    runes = action == ACTION_MINT_RUNES
+    if len(data) < 2 + 2 * (32 + 8 + (16 if runes else 0)):
+        return None
+
+    try:
+        recipient = int(data[2:66], 16)
+        amount = int(data[66:82], 16)
+        asset_id = int(data[82:114], 16) if runes else WRAPPED_BTC
+    except ValueError:
+        return None
+    if not 0 < recipient < ADDRESS_BOUND or amount == 0:
+        return None
+    if runes and asset_id == WRAPPED_BTC:
+        return None
+
+    return MintIntent(recipient, asset_id, amount, tx_hash % FELT_TX_HASH_MODULUS)
+
+
+# Intents recovered from the store, with whether they were already verified
+StoredIntents = List[Tuple[MintIntent, bool]]
+
+
+class MintStore:
+    """
+    Durable record of unminted intents and of the Verifier event cursor.
+
+    Rows belong to ``owner`` (an instance id when watchers share the file).
+    Felt values are stored as hex text since they don't fit in SQLite integers.
+    """
+
+    def __init__(self, db_path: str, owner: str = MINT_STORE_OWNER):
+        self.owner = owner
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Used from the bridge loop only, but may share a file with the shard coordinator
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(MINT_SCHEMA)
+
+    def load(self) -> Tuple[StoredIntents, Optional[int]]:
+        """
+        Returns:
+            This owner's pending intents, and the next block to scan (None if never scanned)
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT recipient, asset_id, amount, bitcoin_tx_hash, verified "
+                "FROM mint_intents WHERE owner = ?", (self.owner,)
+            ).fetchall()
+            cursor = self._db.execute(
+                "SELECT next_block FROM mint_cursors WHERE owner = ?", (self.owner,)
+            ).fetchone()
+        return [self._intent(row) for row in rows], cursor[0] if cursor else None
+
+    def add(self, intent: MintIntent) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO mint_intents (bitcoin_tx_hash, owner, recipient, asset_id, amount, verified, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?) "
+                "ON CONFLICT(bitcoin_tx_hash) DO UPDATE SET owner = excluded.owner, "
+                "recipient = excluded.recipient, asset_id = excluded.asset_id, amount = excluded.amount, "
+                "updated_at = excluded.updated_at",
+                (hex(intent.bitcoin_tx_hash), self.owner, hex(intent.recipient),
+                 hex(intent.asset_id), hex(intent.amount), time.time())
+            )
+
+    def mark_verified(self, tx_hashes: Iterable[int], next_block: int) -> None:
+        """Record verified intents and advance the cursor in one transaction."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "UPDATE mint_intents SET verified = 1, updated_at = ? WHERE bitcoin_tx_hash = ?",
+                    [(now, hex(tx_hash)) for tx_hash in tx_hashes]
+                )
+                self._db.execute(
+                    "INSERT INTO mint_cursors (owner, next_block) VALUES (?, ?) "
+                    "ON CONFLICT(owner) DO UPDATE SET next_block = excluded.next_block",
+                    (self.owner, next_block)
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def remove(self, tx_hashes: Iterable[int]) -> None:
+        """Forget intents that were minted, or will never be."""
+        with self._lock:
+            self._db.executemany(
+                "DELETE FROM mint_intents WHERE bitcoin_tx_hash = ?",
+                [(hex(tx_hash),) for tx_hash in tx_hashes]
+            )
+
+    def adopt(self, live_owners: Sequence[str]) -> Tuple[StoredIntents, Optional[int]]:
+        """
+        Take over the intents of every owner not in ``live_owners``.
+
+        Returns:
+            The adopted intents, and the earliest cursor among their previous
+            owners (None if there was nothing to adopt)
+        """
+        live = list(live_owners) + [self.owner]
+        placeholders = ",".join("?" * len(live))
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT recipient, asset_id, amount, bitcoin_tx_hash, verified FROM mint_intents "
+                    f"WHERE owner NOT IN ({placeholders})", live
+                ).fetchall()
+                cursor = self._db.execute(
+                    f"SELECT MIN(next_block) FROM mint_cursors WHERE owner NOT IN ({placeholders})", live
+                ).fetchone()[0]
+                self._db.execute(
+                    f"UPDATE mint_intents SET owner = ? WHERE owner NOT IN ({placeholders})",
+                    [self.owner] + live
+                )
+                self._db.execute(f"DELETE FROM mint_cursors WHERE owner NOT IN ({placeholders})", live)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        if not rows:
+            return [], None
+        return [self._intent(row) for row in rows], cursor
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _intent(row) -> Tuple[MintIntent, bool]:
+        recipient, asset_id, amount, tx_hash, verified = row
+        return MintIntent(int(recipient, 16), int(asset_id, 16), int(amount, 16), int(tx_hash, 16)), bool(verified)
+
+
+class MintBatcher:
+    """
+    Collects verified mint intents and mints them in bounded batches.
+
+    Must be used from the event loop that drives ``bridge``. Call
+    ``start()`` once, ``expect()`` before submitting each deposit to the
+    Verifier, ``discard()`` if its submission fails, and ``close()`` on
+    shutdown to mint whatever was already verified. Intents stay in
+    ``store`` until they are minted or discarded.
+    """
+
+    def __init__(
+        self,
+        bridge: "RpcBridge",
+        store: MintStore,
+        max_batch_size: int = MINT_BATCH_SIZE,
+        max_delay: float = MINT_BATCH_MAX_DELAY,
+        poll_interval: float = MINT_EVENT_POLL_INTERVAL,
+        events: Optional[Any] = None
+    ):
+        self.bridge = bridge
+        self.store = store
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        # EventLog for mint_batch / mint_failed records, if any
+        self.events = events
+        self.stats = {"batches": 0, "deposits": 0, "failed": 0, "steps": 0, "l2_gas": 0}
+
+        # Waiting for SignatureVerified, by felt tx hash
+        self._expected: Dict[int, MintIntent] = {}
+        # Verified, with the time each became ready
+        self._ready: List[Tuple[float, MintIntent]] = []
+        self._next_block = 0
+        # Set when a batch is put back so it isn't retried in a tight loop
+        self._retry_at = 0.0
+        # Deferrals since the last accepted batch, for the retry backoff
+        self._deferrals = 0
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closing = False
+
+    @property
+    def pending_count(self) -> int:
+        """Deposits registered or verified but not minted yet."""
+        return len(self._expected) + len(self._ready)
+
+    @property
+    def steps_per_deposit(self) -> Optional[float]:
+        """Mean Cairo steps spent per minted deposit, if the node reports steps."""
+        if not self.stats["deposits"] or not self.stats["steps"]:
+            return None
+        return self.stats["steps"] / self.stats["deposits"]
+
+    async def start(self) -> None:
+        """
+        Resume the stored intents and watch Verifier events from the stored
+        cursor, or from the current block on a first start.
+        """
+        pending, cursor = self.store.load()
+        self._next_block = cursor if cursor is not None else await self.bridge.client.get_block_number()
+        self._wakeup = asyncio.Event()
+        await self._restore(pending)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def adopt(self, live_owners: Sequence[str]) -> None:
+        """Take over the stored intents of store owners that are no longer running."""
+        try:
+            pending, cursor = self.store.adopt(live_owners)
+            if cursor is not None and cursor < self._next_block:
+                # Verifications of adopted intents may predate our cursor
+                self._next_block = cursor
+            await self._restore(pending)
+        except Exception as e:
+            print(f"[!] Adopting pending mints failed: {e}", file=sys.stderr)
+            return
+        if pending:
+            self._wakeup.set()
+
+    def expect(self, intent: MintIntent) -> None:
+        """Register an intent to mint once its deposit is verified."""
+        self.store.add(intent)
+        self._expected[intent.bitcoin_tx_hash] = intent
+
+    async def discard(self, tx_hash: int) -> bool:
+        """
+        Forget an intent whose submission to the Verifier failed, unless the
+        deposit is verified anyway, e.g. by an earlier submission of the same
+        transaction that this one collided with.
+
+        Returns:
+            Whether the intent was dropped
+        """
+        tx_hash %= FELT_TX_HASH_MODULUS
+        try:
+            if await self.bridge.is_verified(tx_hash):
+                return False
+        except Exception as e:
+            # Keeping it costs a row; dropping a verified deposit loses the mint
+            print(f"[!] Keeping mint intent for {hex(tx_hash)}, Verifier check failed: {e}", file=sys.stderr)
+            return False
+        self._expected.pop(tx_hash, None)
+        self.store.remove([tx_hash])
+        return True
+
+    async def _restore(self, pending: StoredIntents) -> None:
+        """Queue recovered intents, dropping those the Executor has minted already."""
+        if not pending:
+            return
+        # A failed check counts as not minted; the Executor rejects a second mint anyway
+        claimed = await asyncio.gather(
+            *(self.bridge.is_claimed(intent.bitcoin_tx_hash) for intent, _ in pending),
+            return_exceptions=True
+        )
+        now = time.monotonic()
+        minted = []
+        for (intent, verified), is_claimed in zip(pending, claimed):
+            if is_claimed is True:
+                minted.append(intent.bitcoin_tx_hash)
+            elif verified:
+                self._ready.append((now, intent))
+            else:
+                self._expected[intent.bitcoin_tx_hash] = intent
+        self.store.remove(minted)
+        print(f"[*] Resumed {len(pending) - len(minted)} pending mints "
+              f"({len(minted)} already minted)", file=sys.stderr)
+
+    async def close(self) -> None:
+        """Stop polling and mint every deposit that is already verified."""
+        self._closing = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._in_flight is not None:
+            await self._in_flight
+
+        if self._expected:
+            try:
+                await self._collect()
+            except Exception as e:
+                print(f"[!] Reading Verifier events failed: {e}", file=sys.stderr)
+        # One attempt per batch; a deferral means the nodes are down, so stop there
+        self._retry_at = 0.0
+        while self._ready and time.monotonic() >= self._retry_at:
+            await self._mint(self._take_batch())
+
+        if self.pending_count:
+            print(f"[*] {self.pending_count} deposits not minted before shutdown; "
+                  f"kept for the next start", file=sys.stderr)
+        self.store.close()
+
+    async def _run(self) -> None:
+        while not self._closing:
+            self._wakeup.clear()
+            if self._expected:
+                try:
+                    await self._collect()
+                except Exception as e:
+                    print(f"[!] Reading Verifier events failed: {e}", file=sys.stderr)
+
+            if self._in_flight is None and self._due():
+                self._in_flight = asyncio.ensure_future(self._flush())
+
+            timeout = self.poll_interval
+            # A batch in flight sets the wakeup itself when it settles
+            if self._ready and self._in_flight is None:
+                # Wake up in time for the oldest deposit's deadline
+                deadline = max(self._ready[0][0] + self.max_delay, self._retry_at)
+                timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _collect(self) -> None:
+        """Move intents whose SignatureVerified event has appeared to the ready queue."""
+        tx_hashes, last_block = await self.bridge.get_verified_events(self._next_block)
+        verified = [tx_hash for tx_hash in tx_hashes if tx_hash in self._expected]
+        self.store.mark_verified(verified, last_block + 1)
+        self._next_block = last_block + 1
+        now = time.monotonic()
+        for tx_hash in verified:
+            self._ready.append((now, self._expected.pop(tx_hash)))
+
+    def _due(self) -> bool:
+        if not self._ready or time.monotonic() < self._retry_at:
+            return False
+        if len(self._ready) >= self.max_batch_size:
+            return True
+        return time.monotonic() - self._ready[0][0] >= self.max_delay
+
+    def _take_batch(self) -> List[Tuple[float, MintIntent]]:
+        batch = self._ready[:self.max_batch_size]
+        del self._ready[:self.max_batch_size]
+        return batch
+
+    async def _flush(self) -> None:
+        try:
+            await self._mint(self._take_batch())
+        except Exception as e:
+            print(f"[!] Mint batch failed: {e}", file=sys.stderr)
+        finally:
+            self._in_flight = None
+            # Deposits may have piled up while this batch was in flight
+            self._wakeup.set()
+
+    async def _mint(self, batch: List[Tuple[float, MintIntent]]) -> None:
+        """
+        Mint one batch. A batch that fails is split in half and retried, so
+        one bad deposit only holds back itself.
+        """
+        # Sorted intents let the Executor write each balance once per recipient
+        intents = sorted((intent for _, intent in batch), key=lambda i: (i.asset_id, i.recipient))
+        try:
+            receipt = await (await self.bridge.submit_mint_batch([i._asdict() for i in intents]))
+        except Exception as e:
+            if _node_unavailable(e):
+                self._defer(batch, f"Starknet node unavailable: {e}")
+                return
+            # Fee estimation fails for a batch that would revert, but also
+            # for nonce, fee and RPC errors that say nothing about the deposits
+            receipt = {"status": "error", "tx_hash": None, "revert_reason": str(e)}
+
+        if receipt["status"] == TX_ACCEPTED:
+            self._deferrals = 0
+            self._record(intents, receipt)
+            return
+        if len(batch) > 1:
+            half = len(batch) // 2
+            await self._mint(batch[:half])
+            await self._mint(batch[half:])
+            return
+        if receipt["status"] != TX_REVERTED:
+            self._defer(batch, receipt["revert_reason"])
+            return
+
+        # Only an on-chain revert of this one deposit is final
+        tx_hash = intents[0].bitcoin_tx_hash
+        try:
+            claimed = await self.bridge.is_claimed(tx_hash)
+        except Exception as e:
+            self._defer(batch, f"Executor check failed after revert: {e}")
+            return
+        self.store.remove([tx_hash])
+        if claimed:
+            print(f"[*] Deposit {hex(tx_hash)} was already minted", file=sys.stderr)
+            return
+
+        self.stats["failed"] += 1
+        if self.events is not None:
+            self.events.emit(
+                "mint_failed",
+                bitcoin_tx_hash=hex(tx_hash),
+                l2_tx_hash=receipt["tx_hash"],
+                status=receipt["status"],
+                error=receipt["revert_reason"]
+            )
+
+    def _defer(self, batch: List[Tuple[float, MintIntent]], reason: str) -> None:
+        """Put a batch back at the front of the queue and hold off minting for a while."""
+        self._ready[:0] = batch
+        delay = min(self.poll_interval * 2 ** self._deferrals, MINT_RETRY_MAX_DELAY)
+        self._deferrals += 1
+        self._retry_at = time.monotonic() + delay
+        print(f"[!] Mint of {len(batch)} deposits deferred {delay:.1f}s: {reason}", file=sys.stderr)
+
+    def _record(self, intents: List[MintIntent], receipt: Dict[str, Any]) -> None:
+        # RPC 0.7 nodes report Cairo steps; 0.8+ report gas instead
+        resources = receipt.get("execution_resources") or {}
+        steps = resources.get("steps")
+        l2_gas = resources.get("l2_gas")
+
+        self.store.remove(intent.bitcoin_tx_hash for intent in intents)
+        self.stats["batches"] += 1
+        self.stats["deposits"] += len(intents)
+        self.stats["steps"] += steps or 0
+        self.stats["l2_gas"] += l2_gas or 0
+
+        if self.events is not None:
+            self.events.emit(
+                "mint_batch",
+                l2_tx_hash=receipt["tx_hash"],
+                deposits=len(intents),
+                recipients=len({(i.asset_id, i.recipient) for i in intents}),
+                steps=steps,
+                l2_gas=l2_gas,
+                steps_per_deposit=round(steps / len(intents), 1) if steps else None,
+                bitcoin_tx_hashes=[hex(i.bitcoin_tx_hash) for i in intents]
+            )
@@ -0,0 +1,304 @@
+"""
+Profiling Module - On-demand CPU and memory profiling for a running watcher
+
+Send the watcher ``SIGUSR1`` to open a profiling window and send it again
+(or wait for the window to expire) to close it:
+
+    kill -USR1 <watcher pid>
+
+While the window is open, the stacks of every thread are sampled twice
+over: by a background thread on a wall-clock interval, so threads blocked
+in RPC calls, sleeps or locks show up, and on a CPU-time timer, which only
+fires while the process is running Python code. ``tracemalloc`` traces
+allocations, and ``stage()`` blocks record their wall time. When the
+window closes, results are written to timestamped files in
+``RIFT_PROFILE_DIR``:
+
+- ``profile-<ts>-<pid>.collapsed``     wall-clock folded stacks for flamegraph.pl / speedscope
+- ``profile-<ts>-<pid>.cpu.collapsed`` CPU-time folded stacks, same format
+- ``profile-<ts>-<pid>.tracemalloc``   tracemalloc snapshot (``tracemalloc.Snapshot.load``)
+- ``profile-<ts>-<pid>.alloc.txt``     top allocation sites, human readable
+- ``profile-<ts>-<pid>.stages.json``   per-stage wall time
+
+The signal handlers do as little as possible, since they run on the main
+thread in the middle of whatever it was doing: the toggle handler only
+queues the request for a ``profile-toggle`` thread, which opens and closes
+windows and writes the files, and the CPU-time handler takes no locks.
+
+Outside a window no timer is armed, no sampler thread runs and
+allocations are not traced;
+``stage()`` returns a shared no-op context manager.
+"""
+
+import collections
+import json
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+# Profiling configuration
+RIFT_PROFILE_DIR = os.getenv("RIFT_PROFILE_DIR", "profiles")
+RIFT_PROFILE_WINDOW = float(os.getenv("RIFT_PROFILE_WINDOW", "60"))
+RIFT_PROFILE_SAMPLE_INTERVAL = float(os.getenv("RIFT_PROFILE_SAMPLE_INTERVAL", "0.005"))
+RIFT_PROFILE_TRACEMALLOC_FRAMES = int(os.getenv("RIFT_PROFILE_TRACEMALLOC_FRAMES", "16"))
+
+# Allocation sites listed in the text report
+TOP_ALLOCATIONS = 50
+
+# Profiler threads: the one acting on SIGUSR1, the one closing the window
+# and the wall-clock sampler; all are left out of samples
+TOGGLE_THREAD_NAME = "profile-toggle"
+WINDOW_THREAD_NAME = "profile-window"
+SAMPLER_THREAD_NAME = "profile-sampler"
+PROFILER_THREADS = (TOGGLE_THREAD_NAME, WINDOW_THREAD_NAME, SAMPLER_THREAD_NAME)
+
+_NO_STAGE = nullcontext()
+
+
+class _Stage:
+    """Times one ``with profiler.stage(name)`` block."""
+
+    __slots__ = ("_totals", "_name", "_started")
+
+    def __init__(self, totals: Dict[str, List[float]], name: str):
+        self._totals = totals
+        self._name = name
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._started
+        entry = self._totals.setdefault(self._name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+        return False
+
+
+class OnDemandProfiler:
+    """
+    Wall-clock and CPU-time stack sampling, tracemalloc snapshots and
+    stage timers, all switched on for a bounded window at a time.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = RIFT_PROFILE_DIR,
+        window_seconds: float = RIFT_PROFILE_WINDOW,
+        sample_interval: float = RIFT_PROFILE_SAMPLE_INTERVAL
+    ):
+        self.output_dir = output_dir
+        self.window_seconds = window_seconds
+        self.sample_interval = sample_interval
+        self.active = False
+
+        # Wall-clock samples, taken by the sampler thread
+        self._samples: collections.Counter = collections.Counter()
+        # CPU-time samples, taken by the SIGPROF handler on the main thread
+        self._cpu_samples: collections.Counter = collections.Counter()
+        self._sampler: Optional[threading.Thread] = None
+        self._sampler_stop = threading.Event()
+        # Thread names by ident, refreshed by the sampler thread. The SIGPROF
+        # handler reads this instead of calling threading.enumerate(), whose
+        # lock the interrupted main thread may be holding.
+        self._thread_names: Dict[int, str] = {}
+        # SIGUSR1 requests, drained by the toggle thread
+        self._toggles: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+        self._toggler: Optional[threading.Thread] = None
+        self._stages: Dict[str, List[float]] = {}
+        self._started_at = 0.0
+        self._stamp = ""
+        self._timer: Optional[threading.Timer] = None
+        # start() and stop() run on the toggle, window and main threads
+        self._lock = threading.RLock()
+
+    @property
+    def supported(self) -> bool:
+        return hasattr(signal, "SIGUSR1") and hasattr(signal, "setitimer")
+
+    def install(self, toggle_signal: Optional[int] = None) -> None:
+        """Register the toggle signal handler. Must be called from the main thread."""
+        if not self.supported:
+            print("[!] On-demand profiling needs SIGUSR1 and setitimer; disabled on this platform", file=sys.stderr)
+            return
+        toggle_signal = toggle_signal or signal.SIGUSR1
+        signal.signal(signal.SIGPROF, self._on_sample)
+        if self._toggler is None:
+            self._toggler = threading.Thread(target=self._run_toggles, name=TOGGLE_THREAD_NAME, daemon=True)
+            self._toggler.start()
+        signal.signal(toggle_signal, self._on_toggle)
+        print(f"[*] Profiling: kill -{signal.Signals(toggle_signal).name[3:]} {os.getpid()} to start/stop", file=sys.stderr)
+
+    def stage(self, name: str):
+        """
+        Context manager recording wall time for ``name`` while a window is open.
+
+        When profiling is off this is a shared no-op context manager.
+        """
+        if not self.active:
+            return _NO_STAGE
+        return _Stage(self._stages, name)
+
+    def start(self) -> None:
+        """Open a profiling window; it closes by itself after ``window_seconds``."""
+        with self._lock:
+            if self.active:
+                return
+            self._samples.clear()
+            self._cpu_samples.clear()
+            self._stages = {}
+            self._stamp = time.strftime("%Y%m%d-%H%M%S")
+            self._started_at = time.perf_counter()
+
+            tracemalloc.start(RIFT_PROFILE_TRACEMALLOC_FRAMES)
+            if threading.current_thread() is threading.main_thread():
+                # Otherwise install() has set it up already
+                signal.signal(signal.SIGPROF, self._on_sample)
+            self._thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self.active = True
+
+            self._sampler_stop.clear()
+            self._sampler = threading.Thread(target=self._run_sampler, name=SAMPLER_THREAD_NAME, daemon=True)
+            self._sampler.start()
+            # Armed last, so no CPU sample can land while this thread is
+            # inside Thread.start()
+            signal.setitimer(signal.ITIMER_PROF, self.sample_interval, self.sample_interval)
+
+            if self.window_seconds > 0:
+                self._timer = threading.Timer(self.window_seconds, self.finish)
+                self._timer.name = WINDOW_THREAD_NAME
+                self._timer.daemon = True
+                self._timer.start()
+        print(f"[*] Profiling started for up to {self.window_seconds:.0f}s (pid {os.getpid()})", file=sys.stderr)
+
+    def stop(self) -> Optional[str]:
+        """
+        Close the window and write the results.
+
+        Returns:
+            Common path prefix of the written files, or None if not profiling
+        """
+        with self._lock:
+            if not self.active:
+                return None
+            self.active = False
+            # May run on the window timer thread, where handlers can't be
+            # changed; disarming the timer is enough to stop sampling
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._sampler_stop.set()
+            if self._sampler is not None:
+                self._sampler.join()
+                self._sampler = None
+
+            duration = time.perf_counter() - self._started_at
+            # Drop the profiler's own bookkeeping from the allocation report
+            snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(False, __file__)]
+            )
+            tracemalloc.stop()
+            samples = dict(self._samples)
+            cpu_samples = dict(self._cpu_samples)
+            stages = {name: list(entry) for name, entry in self._stages.items()}
+
+        prefix = os.path.join(self.output_dir, f"profile-{self._stamp}-{os.getpid()}")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._write_collapsed(prefix + ".collapsed", samples)
+        self._write_collapsed(prefix + ".cpu.collapsed", cpu_samples)
+        snapshot.dump(prefix + ".tracemalloc")
+        self._write_allocations(prefix + ".alloc.txt", snapshot)
+        self._write_stages(prefix + ".stages.json", stages, duration)
+        print(f"[*] Profiling stopped after {duration:.1f}s, {sum(samples.values())} wall-clock "
+              f"and {sum(cpu_samples.values())} CPU samples written to {prefix}.*", file=sys.stderr)
+        return prefix
+
+    def finish(self) -> None:
+        """Like ``stop()``, but failures (say, an unwritable RIFT_PROFILE_DIR) are logged, not raised."""
+        try:
+            self.stop()
+        except Exception as e:
+            print(f"[!] Writing the profile failed: {e!r}", file=sys.stderr)
+
+    def _on_toggle(self, signum, frame) -> None:
+        # SimpleQueue.put is safe to call from a signal handler
+        self._toggles.put(signum)
+
+    def _run_toggles(self) -> None:
+        while True:
+            self._toggles.get()
+            if self.active:
+                self.finish()
+                continue
+            try:
+                self.start()
+            except Exception as e:
+                print(f"[!] Starting the profiler failed: {e!r}", file=sys.stderr)
+
+    def _on_sample(self, signum, frame) -> None:
+        if self.active:
+            self._record_stacks(self._cpu_samples, self._thread_names)
+
+    def _run_sampler(self) -> None:
+        # Samples every thread, whether it is running or waiting
+        while not self._sampler_stop.wait(self.sample_interval):
+            self._thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self._record_stacks(self._samples, self._thread_names)
+
+    @staticmethod
+    def _record_stacks(samples: collections.Counter, names: Dict[int, str]) -> None:
+        for ident, top in sys._current_frames().items():
+            if names.get(ident) in PROFILER_THREADS:
+                continue
+            stack = []
+            current = top
+            while current is not None:
+                code = current.f_code
+                # Leave the SIGPROF handler out of the main thread's stack
+                if code.co_filename != __file__:
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                current = current.f_back
+            if stack:
+                stack.append(names.get(ident, f"thread-{ident}"))
+                samples[";".join(reversed(stack))] += 1
+
+    @staticmethod
+    def _write_collapsed(path: str, samples: Dict[str, int]) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(samples.items(), key=lambda item: -item[1]):
+                f.write(f"{stack} {count}\n")
+
+    @staticmethod
+    def _write_allocations(path: str, snapshot: tracemalloc.Snapshot) -> None:
+        stats = snapshot.statistics("lineno")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"Live allocations made during the window: "
+                    f"{sum(stat.size for stat in stats) / 1024:.1f} KiB\n\n")
+            for stat in stats[:TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+
+    @staticmethod
+    def _write_stages(path: str, stages: Dict[str, List[float]], duration: float) -> None:
+        report = {
+            "window_seconds": round(duration, 6),
+            "stages": {
+                name: {
+                    "count": int(count),
+                    "total_seconds": round(total, 6),
+                    "mean_seconds": round(total / count, 6) if count else 0.0,
+                    "max_seconds": round(longest, 6)
+                }
+                for name, (count, total, longest) in stages.items()
+            }
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
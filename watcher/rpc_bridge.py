@@ -6,41 +6,506 @@ and the Starknet Verifier contract using starknet.py for RPC communication.
 """
 
 import os
-from typing import Optional, Dict, Any
-from starknet_py.contract import Contract
-from starknet_py.net.account.account import Account
-from starknet_py.net.full_node_client import FullNodeClient
-from starknet_py.net.signer.stark_curve_signer import KeyPair
-from starknet_py.serialization import serializer_for_function
-from starknet_py.abi.v2 import AbiParser
+import asyncio
+import sys
+import time
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Sequence, Tuple
+
+from endpoint_pool import EndpointPool, parse_urls
+
+# starknet.py and aiohttp take around a second to import, so they are
+# loaded inside the code paths that use them rather than at module load
+if TYPE_CHECKING:
+    import aiohttp
+    from starknet_py.contract import Contract, ContractFunction, InvokeResult
+    from starknet_py.net.account.account import Account
 
 # Configuration
 KATANA_RPC_URL = os.getenv("KATANA_RPC_URL", "http://localhost:5050")
+# Comma-separated list of Starknet nodes; falls back to KATANA_RPC_URL
+KATANA_RPC_URLS = os.getenv("KATANA_RPC_URLS", KATANA_RPC_URL)
 VERIFIER_CONTRACT_ADDRESS = os.getenv("VERIFIER_CONTRACT_ADDRESS", "0x0")
 
+# Compiled Verifier artifact; its ABI and class hash are cached next to it
+VERIFIER_CONTRACT_ARTIFACT = os.getenv(
+    "VERIFIER_CONTRACT_ARTIFACT",
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "..", "contracts", "target", "dev", "rift_verifier_Verifier.contract_class.json"
+    )
+)
+# Executor that mints verified deposits, and its compiled artifact
+EXECUTOR_CONTRACT_ADDRESS = os.getenv("EXECUTOR_CONTRACT_ADDRESS", "0x0")
+EXECUTOR_CONTRACT_ARTIFACT = os.getenv(
+    "EXECUTOR_CONTRACT_ARTIFACT",
+    os.path.join(os.path.dirname(VERIFIER_CONTRACT_ARTIFACT), "rift_verifier_Executor.contract_class.json")
+)
+ABI_CACHE_SUFFIX = ".abi-cache.json"
+ABI_CACHE_FORMAT = 2
+
 # Katana default account credentials (from katana-account.json)
 # These are the default Katana accounts - update if using custom setup
 KATANA_ACCOUNT_ADDRESS = os.getenv("KATANA_ACCOUNT_ADDRESS", "0x127fd5f2f9c6f5a0d6f5e5c5b5a5f5e5d5c5b5a5f5e5d5c5b5a5f5e5d5c5b5a5")
 KATANA_PRIVATE_KEY = os.getenv("KATANA_PRIVATE_KEY", "0x71d7bb07b9a64f6f78ac4c816aff4da9")
 
+# Receipt tracker polling (seconds) and batch limits
+RECEIPT_POLL_MIN_INTERVAL = float(os.getenv("RECEIPT_POLL_MIN_INTERVAL", "0.5"))
+RECEIPT_POLL_MAX_INTERVAL = float(os.getenv("RECEIPT_POLL_MAX_INTERVAL", "5.0"))
+RECEIPT_BATCH_SIZE = int(os.getenv("RECEIPT_BATCH_SIZE", "500"))
+RECEIPT_TIMEOUT = float(os.getenv("RECEIPT_TIMEOUT", "300"))
+# Batch rejections in a row before polling one hash per request, and how
+# long to poll that way before trying batches again (seconds)
+RECEIPT_BATCH_REJECTIONS = int(os.getenv("RECEIPT_BATCH_REJECTIONS", "3"))
+RECEIPT_BATCH_RETRY = float(os.getenv("RECEIPT_BATCH_RETRY", "300"))
+
+# Outcomes a tracked transaction can resolve to
+TX_ACCEPTED = "accepted"
+TX_REVERTED = "reverted"
+TX_REJECTED = "rejected"
+
+# JSON-RPC error codes for an unknown transaction hash and a stale nonce
+TXN_HASH_NOT_FOUND = 29
+INVALID_TRANSACTION_NONCE = 52
+
+# Verifier tx hashes are Bitcoin txids reduced into the felt252 range
+FELT_TX_HASH_MODULUS = 2 ** 251
+
+# Events fetched per starknet_getEvents page
+EVENTS_CHUNK_SIZE = int(os.getenv("EVENTS_CHUNK_SIZE", "1000"))
+
+
+def is_starknet_node_error(error: BaseException) -> bool:
+    """
+    Tell node failures apart from errors the node returned on purpose.
+
+    JSON-RPC errors carry an integer code (contract errors, unknown hash, ...)
+    and would fail the same way on any node. HTTP failures are reported by
+    starknet.py with the status as a string code, and connection problems
+    surface as aiohttp or timeout errors.
+    """
+    from starknet_py.net.client_errors import ClientError
+
+    return not (isinstance(error, ClientError) and isinstance(error.code, int))
+
+
+def is_nonce_error(error: BaseException) -> bool:
+    """
+    Whether a node rejected a transaction for its nonce.
+
+    Some nodes report it as a failed account validation rather than with
+    INVALID_TRANSACTION_NONCE, so the message is checked too.
+    """
+    from starknet_py.net.client_errors import ClientError
+
+    return isinstance(error, ClientError) and (
+        error.code == INVALID_TRANSACTION_NONCE or "nonce" in str(error.message).lower()
+    )
+
+
+def starknet_endpoint_pool(rpc_urls=KATANA_RPC_URLS) -> EndpointPool:
+    """Create an EndpointPool for Starknet nodes."""
+    return EndpointPool(rpc_urls, is_node_error=is_starknet_node_error)
+
+
+def pooled_rpc_http_client(pool: EndpointPool, session: Optional["aiohttp.ClientSession"] = None):
+    """
+    Create a starknet.py RpcHttpClient that spreads calls over an EndpointPool.
+
+    Only ``request`` is overridden, so payloads and error handling stay
+    starknet.py's own. Reads are hedged across nodes. Transaction
+    submissions (``add*Transaction``) fail over on node errors but are never
+    hedged; each attempt is limited to the pool's ``write_timeout``.
+    """
+    from starknet_py.net.http_client import RpcHttpClient
+
+    class PooledRpcHttpClient(RpcHttpClient):
+        async def request(self, address, http_method, params=None, payload=None):
+            method = payload.get("method", "") if isinstance(payload, dict) else ""
+            write = method.startswith("starknet_add")
+
+            async def send(url: str):
+                return await super(PooledRpcHttpClient, self).request(
+                    address=url, http_method=http_method, params=params, payload=payload
+                )
+
+            return await pool.call_async(
+                send, hedge=not write, timeout=pool.write_timeout if write else None
+            )
+
+    return PooledRpcHttpClient(url=pool.primary_url, session=session)
+
+
+def load_abi_cache(artifact_path: str = VERIFIER_CONTRACT_ARTIFACT) -> Dict[str, Any]:
+    """
+    Load the ABI and Sierra class hash of a compiled contract.
+
+    Both are read from the artifact, which also holds the whole Sierra
+    program, and the class hash takes most of a second to compute. They are
+    therefore written to ``<artifact>.abi-cache.json`` and reused on later
+    starts until the artifact's size or mtime, or the starknet.py version,
+    changes.
+
+    Args:
+        artifact_path: Path to the ``*.contract_class.json`` artifact
+
+    Returns:
+        Dict with ``abi`` (list) and ``class_hash`` (int)
+    """
+    import json
+    from importlib.metadata import version
+
+    stat = os.stat(artifact_path)
+    key = [ABI_CACHE_FORMAT, version("starknet-py"), stat.st_size, stat.st_mtime_ns]
+    cache_path = artifact_path + ABI_CACHE_SUFFIX
+
+    try:
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+        if cached.get("key") == key:
+            return {"abi": cached["abi"], "class_hash": int(cached["class_hash"], 16)}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+
+    from starknet_py.common import create_sierra_compiled_contract
+    from starknet_py.hash.sierra_class_hash import compute_sierra_class_hash
+
+    with open(artifact_path, "r") as f:
+        compiled = f.read()
+    abi = json.loads(compiled)["abi"]
+    if isinstance(abi, str):
+        abi = json.loads(abi)
+    class_hash = compute_sierra_class_hash(create_sierra_compiled_contract(compiled))
+
+    try:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"key": key, "class_hash": hex(class_hash), "abi": abi}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[!] Could not write ABI cache {cache_path}: {e}", file=sys.stderr)
+    return {"abi": abi, "class_hash": class_hash}
+
+
+_abi_grammar_shared = False
+
+
+def share_abi_type_grammar() -> None:
+    """
+    Make starknet.py compile its ABI type grammar once per process.
+
+    starknet.py builds a new Lark parser for every type it reads from an
+    ABI. That takes about a second for the Verifier, nearly all of
+    ``Contract()``. A Lark parser can be reused, so ``parse`` in the v2 ABI
+    type parser is replaced with one that keeps the compiled parser. The
+    CairoTypes it returns are the same.
+    """
+    global _abi_grammar_shared
+    if _abi_grammar_shared:
+        return
+    import lark
+    from starknet_py.abi.v2 import parser_transformer
+    from starknet_py.cairo.v2 import type_parser
+
+    if getattr(type_parser, "parse", None) is not parser_transformer.parse:
+        # A starknet.py upgrade changed how types are parsed; stay on its path
+        print("[!] Unexpected starknet.py type parser, ABI parsing is not sped up", file=sys.stderr)
+        _abi_grammar_shared = True
+        return
+
+    grammar = lark.Lark(grammar=parser_transformer.ABI_EBNF, start="type", parser="earley")
+
+    def parse(code, type_identifiers):
+        return parser_transformer.ParserTransformer(type_identifiers).transform(grammar.parse(code))
+
+    type_parser.parse = parse
+    _abi_grammar_shared = True
+
+
+def contract_from_abi(address: str, abi: List[Dict[str, Any]], provider: Any) -> "Contract":
+    """
+    Build a Cairo 1 Contract from an ABI without asking the node for it.
+
+    Args:
+        address: Contract address
+        abi: ABI as loaded by ``load_abi_cache``
+        provider: Account (or client, for calls only) used by the contract
+
+    Returns:
+        starknet.py Contract
+    """
+    from starknet_py.contract import Contract
+
+    share_abi_type_grammar()
+    return Contract(address=address, abi=abi, provider=provider, cairo_version=1)
+
+
+def _rejects_batches(body: Any) -> bool:
+    """Whether a response to a batch request says batches aren't supported."""
+    error = body.get("error") if isinstance(body, dict) else None
+    if not isinstance(error, dict):
+        return False
+    return error.get("code") == -32600 or "batch" in str(error.get("message", "")).lower()
+
+
+class ReceiptTracker:
+    """
+    Tracks many in-flight L2 transactions with a single polling loop.
+
+    Instead of every invocation waiting on its own, pending hashes are
+    registered here and their receipts are fetched together using JSON-RPC
+    batch requests. Each tracked hash gets a future that resolves to a dict
+    with the final status (accepted, reverted or rejected) and the revert
+    reason, if any.
+
+    The poll interval starts at ``min_interval`` and backs off towards
+    ``max_interval`` while nothing changes, dropping back as soon as a
+    transaction resolves or a new one is tracked.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str = KATANA_RPC_URLS,
+        min_interval: float = RECEIPT_POLL_MIN_INTERVAL,
+        max_interval: float = RECEIPT_POLL_MAX_INTERVAL,
+        batch_size: int = RECEIPT_BATCH_SIZE,
+        timeout: float = RECEIPT_TIMEOUT,
+        pool: Optional[EndpointPool] = None
+    ):
+        self.pool = pool if pool is not None else starknet_endpoint_pool(rpc_url)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.interval = min_interval
+        self.requests_sent = 0
+
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._tracked_at: Dict[int, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._batch_rejections = 0
+        self._batch_retry_at = 0.0
+
+    @property
+    def pending_count(self) -> int:
+        """Number of transactions still awaiting a final status."""
+        return len(self._pending)
+
+    def track(self, tx_hash: int) -> asyncio.Future:
+        """
+        Start tracking a transaction hash.
+
+        Args:
+            tx_hash: L2 transaction hash
+
+        Returns:
+            Future resolving to a dict with tx_hash, status, finality_status,
+            revert_reason and execution_resources (None without a receipt)
+        """
+        if tx_hash in self._pending:
+            return self._pending[tx_hash]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[tx_hash] = future
+        self._tracked_at[tx_hash] = time.monotonic()
+
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._poll_loop())
+
+        # New work: poll again soon rather than waiting out a long backoff
+        self.interval = self.min_interval
+        self._wakeup.set()
+        return future
+
+    async def close(self) -> None:
+        """Stop polling and fail any transactions that are still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Receipt tracker closed"))
+        self._pending.clear()
+        self._tracked_at.clear()
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _poll_loop(self) -> None:
+        while self._pending:
+            self._wakeup.clear()
+            try:
+                resolved = await self._poll_once()
+            except Exception as e:
+                # Unreachable nodes or a malformed response: keep polling, but
+                # don't let transactions wait past the timeout because of it
+                print(f"[!] Receipt poll failed: {e!r}", file=sys.stderr)
+                resolved = self._expire(time.monotonic())
+
+            if resolved:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * 2, self.max_interval)
+
+            if not self._pending:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_once(self) -> int:
+        """Fetch receipts for every pending hash. Returns the number resolved."""
+        hashes = list(self._pending)
+        resolved = 0
+        missing: List[int] = []
+
+        for start in range(0, len(hashes), self.batch_size):
+            chunk = hashes[start:start + self.batch_size]
+            responses = await self._batch_call("starknet_getTransactionReceipt", chunk)
+            for tx_hash, response in zip(chunk, responses):
+                if "error" in response:
+                    if (response["error"] or {}).get("code") == TXN_HASH_NOT_FOUND:
+                        missing.append(tx_hash)
+                    continue
+                receipt = response.get("result")
+                if not isinstance(receipt, dict):
+                    # Neither result nor error; ask again on the next poll
+                    continue
+                if receipt.get("execution_status") == "REVERTED":
+                    self._resolve(tx_hash, TX_REVERTED, receipt.get("finality_status"),
+                                  receipt.get("revert_reason"), receipt.get("execution_resources"))
+                    resolved += 1
+                elif receipt.get("finality_status") in ("ACCEPTED_ON_L2", "ACCEPTED_ON_L1"):
+                    self._resolve(tx_hash, TX_ACCEPTED, receipt.get("finality_status"),
+                                  execution_resources=receipt.get("execution_resources"))
+                    resolved += 1
+
+        # Hashes without a receipt may have been rejected by the sequencer
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start:start + self.batch_size]
+            responses = await self._batch_call("starknet_getTransactionStatus", chunk)
+            for tx_hash, response in zip(chunk, responses):
+                status = response.get("result")
+                if isinstance(status, dict) and status.get("finality_status") == "REJECTED":
+                    self._resolve(tx_hash, TX_REJECTED, "REJECTED", "Rejected by sequencer")
+                    resolved += 1
+
+        return resolved + self._expire(time.monotonic(), missing)
+
+    def _expire(self, now: float, tx_hashes: Optional[List[int]] = None) -> int:
+        """Give up on hashes tracked for longer than the timeout. Returns how many."""
+        expired = 0
+        for tx_hash in list(self._pending if tx_hashes is None else tx_hashes):
+            if tx_hash in self._pending and now - self._tracked_at[tx_hash] > self.timeout:
+                self._resolve(tx_hash, TX_REJECTED, None, f"No receipt after {self.timeout:.0f}s")
+                expired += 1
+        return expired
+
+    async def _batch_call(self, method: str, tx_hashes: List[int]) -> List[Dict[str, Any]]:
+        """Send one JSON-RPC batch and return the responses in request order."""
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession()
+
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": {"transaction_hash": hex(h)}, "id": i}
+            for i, h in enumerate(tx_hashes)
+        ]
+
+        async def post(url: str, body: Any) -> Any:
+            async with self._session.post(url, json=body) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+        if time.monotonic() >= self._batch_retry_at:
+            self.requests_sent += 1
+            body = await self.pool.call_async(lambda url: post(url, payload), hedge=True)
+            if isinstance(body, list):
+                self._batch_rejections = 0
+                by_id = {item.get("id"): item for item in body}
+                return [by_id.get(i, {"error": {"code": None}}) for i in range(len(tx_hashes))]
+            # Anything else is answered with single calls this time. Only a node
+            # that keeps rejecting batches is polled that way for a while.
+            if _rejects_batches(body):
+                self._batch_rejections += 1
+                if self._batch_rejections >= RECEIPT_BATCH_REJECTIONS:
+                    print(f"[!] Node rejects JSON-RPC batches, polling individually for "
+                          f"{RECEIPT_BATCH_RETRY:.0f}s", file=sys.stderr)
+                    self._batch_rejections = 0
+                    self._batch_retry_at = time.monotonic() + RECEIPT_BATCH_RETRY
+
+        async def single(request: Dict[str, Any]) -> Dict[str, Any]:
+            return await self.pool.call_async(lambda url: post(url, request), hedge=True)
+
+        self.requests_sent += len(payload)
+        return list(await asyncio.gather(*(single(request) for request in payload)))
+
+    def _resolve(
+        self,
+        tx_hash: int,
+        status: str,
+        finality_status: Optional[str],
+        revert_reason: Optional[str] = None,
+        execution_resources: Optional[Dict[str, Any]] = None
+    ) -> None:
+        future = self._pending.pop(tx_hash)
+        self._tracked_at.pop(tx_hash, None)
+        if not future.done():
+            future.set_result({
+                "tx_hash": hex(tx_hash),
+                "status": status,
+                "finality_status": finality_status,
+                "revert_reason": revert_reason,
+                "execution_resources": execution_resources
+            })
+
 
 class RpcBridge:
     """
     Bridge class for communicating with the Starknet Verifier contract.
     
     Handles:
-    - Connection to Katana/Starknet node
+    - Connection to Katana/Starknet nodes (failover across KATANA_RPC_URLS)
     - Account setup and signing
     - Contract interaction (declare, deploy, invoke)
     - Transaction status monitoring
     """
     
-    def __init__(self, rpc_url: str = KATANA_RPC_URL):
-        self.rpc_url = rpc_url
-        self.client = FullNodeClient(node_url=rpc_url)
-        self.account: Optional[Account] = None
-        self.verifier_contract: Optional[Contract] = None
+    def __init__(self, rpc_url: str = KATANA_RPC_URLS):
+        self.rpc_urls = parse_urls(rpc_url)
+        self.rpc_url = self.rpc_urls[0]
+        self.endpoint_pool = starknet_endpoint_pool(self.rpc_urls)
+
+        from starknet_py.net.full_node_client import FullNodeClient
+        from starknet_py.net.http_client import RpcHttpClient
+
+        self.client = FullNodeClient(node_url=self.rpc_url)
+        # FullNodeClient has no public transport hook; fail loudly rather than
+        # silently bypass the pool if a starknet.py upgrade moves it
+        if not isinstance(getattr(self.client, "_client", None), RpcHttpClient):
+            raise RuntimeError("Unsupported starknet.py version: FullNodeClient._client is not an RpcHttpClient")
+        # Route every client call through the pool instead of a single node
+        self.client._client = pooled_rpc_http_client(self.endpoint_pool)
+        self.account: Optional["Account"] = None
+        self.verifier_contract: Optional["Contract"] = None
         self.verifier_address: Optional[str] = None
+        self.executor_contract: Optional["Contract"] = None
+        self.executor_address: Optional[str] = None
+        self.receipt_tracker = ReceiptTracker(pool=self.endpoint_pool)
+        # Next account nonce, read from the node once and advanced locally
+        self._nonce: Optional[int] = None
+        self._nonce_lock = asyncio.Lock()
         
     async def setup_account(
         self, 
@@ -54,6 +519,9 @@ class RpcBridge:
             address: Account address (hex string)
             private_key: Private key for signing (hex string)
         """
+        from starknet_py.net.account.account import Account
+        from starknet_py.net.signer.stark_curve_signer import KeyPair
+
         # Ensure proper hex format
         if not address.startswith("0x"):
             address = f"0x{address}"
@@ -66,25 +534,67 @@ class RpcBridge:
             key_pair=KeyPair.from_private_key(int(private_key, 16)),
             chain=await self.client.get_chain_id()
         )
-        print(f"[*] Account initialized: {address[:10]}...")
+        print(f"[*] Account initialized: {address[:10]}...", file=sys.stderr)
         
-    async def load_verifier_contract(self, contract_address: str) -> None:
+    async def load_verifier_contract(
+        self,
+        contract_address: str,
+        artifact_path: str = VERIFIER_CONTRACT_ARTIFACT
+    ) -> None:
         """
         Load an existing Verifier contract instance.
         
+        Uses the cached ABI of the local compiled artifact when it matches
+        the class deployed at ``contract_address``, and fetches the class
+        from the node otherwise.
+        
         Args:
             contract_address: Deployed contract address (hex string)
+            artifact_path: Compiled Verifier artifact (*.contract_class.json)
         """
         if not contract_address.startswith("0x"):
             contract_address = f"0x{contract_address}"
             
-        # Load the contract using the compiled ABI
-        self.verifier_contract = await Contract.from_address(
-            address=contract_address,
-            provider=self.account
-        )
+        self.verifier_contract = await self._load_contract(contract_address, artifact_path)
         self.verifier_address = contract_address
-        print(f"[*] Verifier contract loaded: {contract_address}")
+        print(f"[*] Verifier contract loaded: {contract_address}", file=sys.stderr)
+
+    async def load_executor_contract(
+        self,
+        contract_address: str = EXECUTOR_CONTRACT_ADDRESS,
+        artifact_path: str = EXECUTOR_CONTRACT_ARTIFACT
+    ) -> None:
+        """
+        Load an existing Executor contract instance.
+        
+        Args:
+            contract_address: Deployed contract address (hex string)
+            artifact_path: Compiled Executor artifact (*.contract_class.json)
+        """
+        if not contract_address.startswith("0x"):
+            contract_address = f"0x{contract_address}"
+
+        self.executor_contract = await self._load_contract(contract_address, artifact_path)
+        self.executor_address = contract_address
+        print(f"[*] Executor contract loaded: {contract_address}", file=sys.stderr)
+
+    async def _load_contract(self, contract_address: str, artifact_path: str) -> "Contract":
+        from starknet_py.contract import Contract
+
+        # Also speeds up parsing an ABI fetched from the node
+        share_abi_type_grammar()
+
+        if os.path.exists(artifact_path):
+            cached = load_abi_cache(artifact_path)
+            # One cheap call instead of downloading the class; a stale local
+            # build must not be trusted to describe what is deployed
+            deployed = await self.client.get_class_hash_at(contract_address)
+            if deployed == cached["class_hash"]:
+                return contract_from_abi(contract_address, cached["abi"], self.account)
+            print(f"[!] {os.path.basename(artifact_path)} does not match the class deployed at "
+                  f"{contract_address} ({hex(deployed)}); fetching its ABI from the node", file=sys.stderr)
+
+        return await Contract.from_address(address=contract_address, provider=self.account)
         
     async def declare_and_deploy_verifier(
         self, 
@@ -138,9 +648,9 @@ class RpcBridge:
                 check=True
             )
             class_hash = int(result.stdout.strip(), 16)
-            print(f"[*] Computed class hash: {hex(class_hash)}")
+            print(f"[*] Computed class hash: {hex(class_hash)}", file=sys.stderr)
         except Exception as e:
-            print(f"[!] Could not compute class hash with starkli: {e}")
+            print(f"[!] Could not compute class hash with starkli: {e}", file=sys.stderr)
             raise RuntimeError(
                 "Failed to compute class hash. Please ensure starkli is installed and in PATH. "
                 "Alternatively, compute it manually and pass it as a parameter."
@@ -155,7 +665,7 @@ class RpcBridge:
         # Send the declare transaction
         declare_tx = await self.account.client.send_transaction(declare_result)
         await self.account.client.wait_for_tx(declare_tx)
-        print(f"[*] Contract declared: {hex(class_hash)}")
+        print(f"[*] Contract declared: {hex(class_hash)}", file=sys.stderr)
         
         # Now deploy using the class hash
         from starknet_py.contract import Contract
@@ -167,7 +677,7 @@ class RpcBridge:
             max_fee=int(1e16)  # 0.01 ETH for deployment
         )
         await deploy_result.wait_for_acceptance()
-        print(f"[*] Contract deployed: {hex(deploy_result.deployed_contract_address)}")
+        print(f"[*] Contract deployed: {hex(deploy_result.deployed_contract_address)}", file=sys.stderr)
 
         # Load the contract instance
         self.verifier_contract = deploy_result.deployed_contract
@@ -179,7 +689,7 @@ class RpcBridge:
             "deploy_hash": hex(deploy_result.hash)
         }
         
-    async def verify_signature(
+    async def submit_signature(
         self,
         tx_hash: int,
         public_key_x: int,
@@ -187,9 +697,12 @@ class RpcBridge:
         msg_hash: int,
         r: int,
         s: int
-    ) -> Dict[str, Any]:
+    ) -> asyncio.Future:
         """
-        Call the verify_secp256k1_signature function on the Verifier contract.
+        Send verify_secp256k1_signature without waiting for it to settle.
+        
+        The transaction is handed to the shared receipt tracker, so many
+        submissions can be in flight while their receipts are polled together.
         
         Args:
             tx_hash: Transaction hash (felt252)
@@ -200,45 +713,163 @@ class RpcBridge:
             s: Signature S component (u256)
             
         Returns:
-            Dict with invocation result and transaction info
+            Future resolving to the receipt tracker result for the L2 transaction
         """
         if self.verifier_contract is None:
             raise RuntimeError("Verifier contract not loaded. Call load_verifier_contract first.")
             
-        # Prepare u256 values as (low, high) tuples for Cairo
-        # u256 in Cairo is represented as two u128 values
-        def to_u256(value: int) -> tuple:
-            low = value & ((1 << 128) - 1)
-            high = (value >> 128) & ((1 << 128) - 1)
-            return (low, high)
-            
         # Convert tx_hash to felt (ensure it's within felt range)
-        felt_tx_hash = tx_hash % (2 ** 251)
+        felt_tx_hash = tx_hash % FELT_TX_HASH_MODULUS
         
-        # Prepare the function call
-        invocation = await self.verifier_contract.functions["verify_secp256k1_signature"].invoke(
+        # u256 arguments are split into (low, high) by starknet.py
+        invocation = await self._invoke(
+            self.verifier_contract.functions["verify_secp256k1_signature"],
             tx_hash=felt_tx_hash,
-            public_key_x=to_u256(public_key_x),
-            public_key_y=to_u256(public_key_y),
-            msg_hash=to_u256(msg_hash),
-            r=to_u256(r),
-            s=to_u256(s),
-            max_fee=int(1e15)  # 0.001 ETH
+            public_key_x=public_key_x,
+            public_key_y=public_key_y,
+            msg_hash=msg_hash,
+            r=r,
+            s=s
         )
         
-        # Wait for the transaction to be accepted
-        result = await invocation.wait_for_acceptance()
+        return self.receipt_tracker.track(invocation.hash)
+        
+    async def verify_signature(
+        self,
+        tx_hash: int,
+        public_key_x: int,
+        public_key_y: int,
+        msg_hash: int,
+        r: int,
+        s: int
+    ) -> Dict[str, Any]:
+        """
+        Call the verify_secp256k1_signature function on the Verifier contract.
+        
+        Args:
+            tx_hash: Transaction hash (felt252)
+            public_key_x: X coordinate of public key (u256)
+            public_key_y: Y coordinate of public key (u256)
+            msg_hash: Message hash (u256)
+            r: Signature R component (u256)
+            s: Signature S component (u256)
+            
+        Returns:
+            Dict with invocation result and transaction info
+        """
+        # Wait for the shared receipt tracker to see the transaction settle
+        receipt = await (await self.submit_signature(
+            tx_hash, public_key_x, public_key_y, msg_hash, r, s
+        ))
         
         # Get the verification count after the call
         verification_count = await self.verifier_contract.functions["get_verification_count"].call()
         
         return {
-            "success": True,
-            "tx_hash": hex(result.hash),
+            "success": receipt["status"] == TX_ACCEPTED,
+            "status": receipt["status"],
+            "revert_reason": receipt["revert_reason"],
+            "tx_hash": receipt["tx_hash"],
             "verification_count": verification_count,
             "contract_address": self.verifier_address
         }
         
+    async def submit_mint_batch(self, intents: Sequence[Dict[str, int]]) -> asyncio.Future:
+        """
+        Send one Executor.mint_batch transaction for several verified deposits.
+        
+        Intents should be sorted by (asset_id, recipient): the Executor
+        writes each recipient's balance once per run of equal keys.
+        
+        Args:
+            intents: Dicts with recipient, asset_id, amount and bitcoin_tx_hash
+            
+        Returns:
+            Future resolving to the receipt tracker result for the L2 transaction
+        """
+        if self.executor_contract is None:
+            raise RuntimeError("Executor contract not loaded. Call load_executor_contract first.")
+
+        invocation = await self._invoke(self.executor_contract.functions["mint_batch"], intents=list(intents))
+        return self.receipt_tracker.track(invocation.hash)
+
+    async def _invoke(self, function: "ContractFunction", **kwargs) -> "InvokeResult":
+        """
+        Send an invoke signed with the next nonce from the local counter.
+        
+        starknet.py reads the account nonce from the node for every invoke,
+        so two submissions in flight at once would sign with the same nonce
+        and one would be rejected. The counter is read once and advanced
+        here instead, and sends are serialized so nonces reach the node in
+        order. Only estimating and sending hold the lock; receipts are awaited
+        concurrently. After a nonce error the counter is read from the node
+        again and the invoke retried once.
+        
+        Args:
+            function: Contract function to invoke
+            **kwargs: Its arguments
+            
+        Returns:
+            starknet.py InvokeResult
+        """
+        async with self._nonce_lock:
+            for attempt in range(2):
+                if self._nonce is None:
+                    self._nonce = await self.account.get_nonce()
+                try:
+                    invocation = await function.invoke_v3(nonce=self._nonce, auto_estimate=True, **kwargs)
+                except Exception as e:
+                    if is_nonce_error(e) and attempt == 0:
+                        print(f"[!] Nonce {self._nonce} rejected, resyncing from the node", file=sys.stderr)
+                        self._nonce = None
+                        continue
+                    if is_nonce_error(e) or is_starknet_node_error(e):
+                        # The node may have taken the nonce before failing
+                        self._nonce = None
+                    raise
+                self._nonce += 1
+                return invocation
+
+    async def get_verified_events(
+        self,
+        from_block: int,
+        to_block: Optional[int] = None
+    ) -> Tuple[List[int], int]:
+        """
+        Read SignatureVerified events emitted by the Verifier.
+        
+        Args:
+            from_block: First block to scan (inclusive)
+            to_block: Last block to scan; defaults to the latest block
+            
+        Returns:
+            (tx hashes verified in the range, last block scanned)
+        """
+        if self.verifier_address is None:
+            raise RuntimeError("Verifier contract not loaded.")
+
+        from starknet_py.hash.selector import get_selector_from_name
+
+        if to_block is None:
+            to_block = await self.client.get_block_number()
+        if to_block < from_block:
+            return [], to_block
+
+        chunk = await self.client.get_events(
+            address=self.verifier_address,
+            keys=[[get_selector_from_name("SignatureVerified")]],
+            from_block_number=from_block,
+            to_block_number=to_block,
+            follow_continuation_token=True,
+            chunk_size=EVENTS_CHUNK_SIZE
+        )
+        # keys = [selector, tx_hash]; data = [public_key_x.low, public_key_x.high, verified]
+        tx_hashes = [
+            event.keys[1] for event in chunk.events
+            if len(event.keys) > 1 and event.data and event.data[-1]
+        ]
+        return tx_hashes, to_block
+
     async def is_verified(self, tx_hash: int) -> bool:
         """
         Check if a transaction has been verified.
@@ -252,9 +883,26 @@ class RpcBridge:
         if self.verifier_contract is None:
             raise RuntimeError("Verifier contract not loaded.")
             
-        felt_tx_hash = tx_hash % (2 ** 251)
-        result = await self.verifier_contract.functions["is_verified"].call(tx_hash=felt_tx_hash)
-        return result
+        felt_tx_hash = tx_hash % FELT_TX_HASH_MODULUS
+        (verified,) = await self.verifier_contract.functions["is_verified"].call(tx_hash=felt_tx_hash)
+        return verified
+
+    async def is_claimed(self, tx_hash: int) -> bool:
+        """
+        Check if the Executor has already minted a deposit.
+        
+        Args:
+            tx_hash: Bitcoin transaction hash of the deposit
+            
+        Returns:
+            True if minted, False otherwise
+        """
+        if self.executor_contract is None:
+            raise RuntimeError("Executor contract not loaded.")
+
+        felt_tx_hash = tx_hash % FELT_TX_HASH_MODULUS
+        (claimed,) = await self.executor_contract.functions["is_claimed"].call(bitcoin_tx_hash=felt_tx_hash)
+        return claimed
         
     async def get_verification_count(self) -> int:
         """
@@ -282,6 +930,10 @@ class RpcBridge:
         result = await self.verifier_contract.functions["get_owner"].call()
         return hex(result)
 
+    async def close(self) -> None:
+        """Release the receipt tracker and its HTTP session."""
+        await self.receipt_tracker.close()
+
 
 async def test_bridge():
     """Test function for the RPC bridge."""
@@ -0,0 +1,412 @@
+"""
+Sharding Module - Split the txid space across several watcher instances
+
+Each watcher registers itself in a shared SQLite database and renews a
+lease from a background thread, so a slow poll cycle doesn't let it lapse.
+Live instances are placed on a consistent-hash ring,
+and a detected txid belongs to the instance that follows its hash on the
+ring. When an instance stops renewing its lease, it drops off the ring and
+its share moves to the survivors.
+
+The ring decides who *should* handle a txid. The claims table guarantees
+that only one instance *does*: before submitting, an instance atomically
+claims the txid. Claims left unfinished by an instance that died are
+adopted by the txid's new owner, so a detection is neither lost nor
+submitted twice when ownership moves. Every claim carries an epoch that
+grows with each takeover; it serves as a fencing token, so a submission
+started under an older claim can tell it has been superseded.
+
+A watcher running alone uses LocalClaims instead: the same calls backed by
+memory, so a transaction that sits in the mempool for many poll cycles is
+still submitted once.
+"""
+
+import bisect
+import hashlib
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Coordination defaults
+SHARD_LEASE_SECONDS = float(os.getenv("SHARD_LEASE_SECONDS", "15"))
+SHARD_VIRTUAL_NODES = int(os.getenv("SHARD_VIRTUAL_NODES", "64"))
+# How long completed claims are remembered (seconds)
+SHARD_CLAIM_RETENTION = float(os.getenv("SHARD_CLAIM_RETENTION", "86400"))
+# How many settled txids a single instance remembers
+LOCAL_CLAIM_RETENTION = int(os.getenv("LOCAL_CLAIM_RETENTION", "100000"))
+
+# Claim states
+CLAIMED = "claimed"
+COMPLETED = "completed"
+# Given up for a retry; the row stays so the txid's epoch keeps growing
+RELEASED = "released"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    instance_id TEXT PRIMARY KEY,
+    heartbeat_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    txid TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    state TEXT NOT NULL,
+    tx_hex TEXT,
+    updated_at REAL NOT NULL,
+    epoch INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS claims_owner_state ON claims (owner, state);
+"""
+
+
+def _ring_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes."""
+
+    def __init__(self, members: List[str], virtual_nodes: int = SHARD_VIRTUAL_NODES):
+        self.members = sorted(members)
+        points = sorted(
+            (_ring_hash(f"{member}#{index}"), member)
+            for member in self.members
+            for index in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [member for _, member in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        index = bisect.bisect(self._hashes, _ring_hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class ShardCoordinator:
+    """
+    Coordinates txid ownership between watcher instances sharing ``db_path``.
+
+    Call ``start()`` once to keep the lease alive in the background,
+    ``heartbeat()`` once per polling cycle to refresh the ring, ``owns()`` +
+    ``claim()`` before submitting a detection, ``holds()`` right before the
+    submission goes out, and ``complete()`` or ``release()`` once it
+    settles. The epoch returned by ``claim()`` is passed to the later calls.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        instance_id: Optional[str] = None,
+        lease_seconds: float = SHARD_LEASE_SECONDS,
+        virtual_nodes: int = SHARD_VIRTUAL_NODES
+    ):
+        self.instance_id = instance_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.virtual_nodes = virtual_nodes
+        self.ring = HashRing([self.instance_id], virtual_nodes)
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Submissions settle on the bridge thread, so share one guarded connection
+        self._lock = threading.Lock()
+        self._closed = False
+        self._db = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(claims)")]
+        if "epoch" not in columns:
+            # Databases created before claims were fenced
+            self._db.execute("ALTER TABLE claims ADD COLUMN epoch INTEGER NOT NULL DEFAULT 0")
+        self._stop = threading.Event()
+        self._renewer: Optional[threading.Thread] = None
+        # Claims left by an earlier process with the same instance id
+        self._recovered: List[Tuple[str, Optional[str], int]] = []
+
+    def start(self) -> None:
+        """
+        Register this instance and renew its lease every third of the lease period.
+
+        With a fixed instance id, claims still CLAIMED under it were left by
+        a previous process that died. Nobody else adopts them (the owner
+        looks alive again), so they are taken back here under a new epoch
+        and handed out by the next ``adopt_orphans()``.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "UPDATE claims SET epoch = epoch + 1, updated_at = ? WHERE owner = ? AND state = ?",
+                    (time.time(), self.instance_id, CLAIMED)
+                )
+                self._recovered = self._db.execute(
+                    "SELECT txid, tx_hex, epoch FROM claims WHERE owner = ? AND state = ?",
+                    (self.instance_id, CLAIMED)
+                ).fetchall()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        if self._recovered:
+            print(f"[*] Resuming {len(self._recovered)} unfinished claims of {self.instance_id}",
+                  file=sys.stderr)
+        self.renew_lease()
+        self._renewer = threading.Thread(target=self._renew_loop, name="shard-heartbeat", daemon=True)
+        self._renewer.start()
+
+    def renew_lease(self) -> None:
+        """Mark this instance alive for another ``lease_seconds``."""
+        with self._lock:
+            if self._closed:
+                return
+            self._db.execute(
+                "INSERT INTO members (instance_id, heartbeat_at) VALUES (?, ?) "
+                "ON CONFLICT(instance_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at",
+                (self.instance_id, time.time())
+            )
+
+    def _renew_loop(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self.renew_lease()
+            except Exception as e:
+                print(f"[!] Renewing shard lease failed: {e}", file=sys.stderr)
+
+    def heartbeat(self) -> bool:
+        """
+        Renew this instance's lease, expire dead members and refresh the ring.
+
+        Returns:
+            True if the set of live instances changed since the last call
+        """
+        self.renew_lease()
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM members WHERE heartbeat_at < ?", (now - self.lease_seconds,)
+            )
+            self._db.execute(
+                "DELETE FROM claims WHERE state != ? AND updated_at < ?",
+                (CLAIMED, now - SHARD_CLAIM_RETENTION)
+            )
+            members = [row[0] for row in self._db.execute("SELECT instance_id FROM members")]
+
+        if sorted(members) == self.ring.members:
+            return False
+        self.ring = HashRing(members, self.virtual_nodes)
+        return True
+
+    def owns(self, txid: str) -> bool:
+        """Whether this instance is responsible for ``txid`` on the current ring."""
+        return self.ring.owner(txid) == self.instance_id
+
+    def claim(self, txid: str, tx_hex: Optional[str] = None) -> Optional[int]:
+        """
+        Atomically take responsibility for submitting ``txid``.
+
+        Succeeds if nobody has claimed it yet, if it was released, or if the
+        previous claimant left it unfinished and is no longer alive.
+
+        Args:
+            txid: Bitcoin transaction ID
+            tx_hex: Raw transaction, kept so a successor can finish the job
+
+        Returns:
+            The claim's epoch (fencing token) if this instance now holds
+            the claim, otherwise None
+        """
+        now = time.time()
+        with self._lock:
+            if self._closed:
+                return None
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT owner, state, epoch FROM claims WHERE txid = ?", (txid,)
+                ).fetchone()
+                epoch = 1
+                if row is not None:
+                    owner, state, previous_epoch = row
+                    if state == COMPLETED or (state == CLAIMED and (
+                            owner == self.instance_id or self._is_alive(owner, now))):
+                        self._db.execute("ROLLBACK")
+                        return None
+                    epoch = previous_epoch + 1
+                self._db.execute(
+                    "INSERT INTO claims (txid, owner, state, tx_hex, updated_at, epoch) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(txid) DO UPDATE SET owner = excluded.owner, state = excluded.state, "
+                    "tx_hex = COALESCE(excluded.tx_hex, claims.tx_hex), "
+                    "updated_at = excluded.updated_at, epoch = excluded.epoch",
+                    (txid, self.instance_id, CLAIMED, tx_hex, now, epoch)
+                )
+                self._db.execute("COMMIT")
+                return epoch
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def holds(self, txid: str, epoch: int) -> bool:
+        """
+        Whether the claim taken with ``epoch`` is still this instance's and unfinished.
+
+        False once another instance has taken the txid over, even if this
+        instance has since claimed it again under a newer epoch.
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            row = self._db.execute(
+                "SELECT 1 FROM claims WHERE txid = ? AND owner = ? AND state = ? AND epoch = ?",
+                (txid, self.instance_id, CLAIMED, epoch)
+            ).fetchone()
+        return row is not None
+
+    def complete(self, txid: str, epoch: int) -> None:
+        """Mark ``txid`` as handled for good; no instance will submit it again."""
+        with self._lock:
+            if self._closed:
+                return
+            self._db.execute(
+                "UPDATE claims SET state = ?, tx_hex = NULL, updated_at = ? "
+                "WHERE txid = ? AND owner = ? AND epoch = ?",
+                (COMPLETED, time.time(), txid, self.instance_id, epoch)
+            )
+
+    def release(self, txid: str, epoch: int) -> None:
+        """Give up an unfinished claim so the txid can be retried."""
+        with self._lock:
+            if self._closed:
+                # Left the ring already; the claim will be adopted instead
+                return
+            self._db.execute(
+                "UPDATE claims SET state = ?, updated_at = ? "
+                "WHERE txid = ? AND owner = ? AND state = ? AND epoch = ?",
+                (RELEASED, time.time(), txid, self.instance_id, CLAIMED, epoch)
+            )
+
+    def adopt_orphans(self) -> List[Tuple[str, Optional[str], int]]:
+        """
+        Take over unfinished claims from instances that are no longer alive.
+
+        Only txids that map to this instance on the current ring are adopted,
+        so survivors split a dead instance's backlog the same way they split
+        new detections. The first call after ``start()`` also returns the
+        claims recovered from this instance id's previous process.
+
+        Returns:
+            (txid, tx_hex, epoch) for each claim this instance now holds
+        """
+        now = time.time()
+        with self._lock:
+            if self._closed:
+                return []
+            recovered, self._recovered = self._recovered, []
+            rows = self._db.execute(
+                "SELECT txid, owner FROM claims WHERE state = ? AND owner != ?",
+                (CLAIMED, self.instance_id)
+            ).fetchall()
+            dead = {owner for _, owner in rows if not self._is_alive(owner, now)}
+
+        adopted = list(recovered)
+        for txid, owner in rows:
+            if owner not in dead or not self.owns(txid):
+                continue
+            epoch = self.claim(txid)
+            if epoch is not None:
+                with self._lock:
+                    row = self._db.execute("SELECT tx_hex FROM claims WHERE txid = ?", (txid,)).fetchone()
+                adopted.append((txid, row[0] if row else None, epoch))
+        return adopted
+
+    def leave(self) -> None:
+        """
+        Deregister on shutdown so the others rebalance right away.
+
+        Unfinished claims stay in place and are adopted by the new owners.
+        """
+        self._stop.set()
+        if self._renewer is not None:
+            self._renewer.join()
+        with self._lock:
+            if self._closed:
+                return
+            self._db.execute("DELETE FROM members WHERE instance_id = ?", (self.instance_id,))
+            self._db.close()
+            self._closed = True
+
+    def _is_alive(self, instance_id: str, now: float) -> bool:
+        row = self._db.execute(
+            "SELECT heartbeat_at FROM members WHERE instance_id = ?", (instance_id,)
+        ).fetchone()
+        return row is not None and row[0] >= now - self.lease_seconds
+
+
+class LocalClaims:
+    """
+    In-memory claims for a watcher running without SHARD_DB_PATH.
+
+    Same ``claim()``, ``holds()``, ``complete()`` and ``release()`` calls and
+    epochs as ShardCoordinator, minus ownership and adoption. Settled txids
+    are forgotten oldest first once more than ``retention`` are kept.
+    """
+
+    def __init__(self, retention: int = LOCAL_CLAIM_RETENTION):
+        self.retention = retention
+        # Claims settle on the bridge thread while the poll loop makes new ones
+        self._lock = threading.Lock()
+        # txid -> (state, epoch), oldest change first
+        self._claims: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._in_flight: Dict[str, int] = {}
+
+    def claim(self, txid: str, tx_hex: Optional[str] = None) -> Optional[int]:
+        """
+        Take ``txid`` unless it is in flight or completed.
+
+        Returns:
+            The claim's epoch, or None if the txid is not up for submission
+        """
+        with self._lock:
+            state, epoch = self._claims.get(txid, (RELEASED, 0))
+            if state != RELEASED:
+                return None
+            self._set(txid, CLAIMED, epoch + 1)
+            return epoch + 1
+
+    def holds(self, txid: str, epoch: int) -> bool:
+        """Whether the claim taken with ``epoch`` is still unfinished."""
+        with self._lock:
+            return self._claims.get(txid) == (CLAIMED, epoch)
+
+    def complete(self, txid: str, epoch: int) -> None:
+        """Mark ``txid`` as handled for good."""
+        with self._lock:
+            if self._claims.get(txid, (None, None))[1] == epoch:
+                self._set(txid, COMPLETED, epoch)
+
+    def release(self, txid: str, epoch: int) -> None:
+        """Give up an unfinished claim so the txid is retried on a later poll."""
+        with self._lock:
+            if self._claims.get(txid) == (CLAIMED, epoch):
+                self._set(txid, RELEASED, epoch)
+
+    def _set(self, txid: str, state: str, epoch: int) -> None:
+        self._claims[txid] = (state, epoch)
+        self._claims.move_to_end(txid)
+        if state == CLAIMED:
+            self._in_flight[txid] = epoch
+        else:
+            self._in_flight.pop(txid, None)
+        # In-flight claims are never dropped, whatever their age
+        excess = len(self._claims) - len(self._in_flight) - self.retention
+        for old in list(self._claims):
+            if excess <= 0:
+                break
+            if old not in self._in_flight:
+                del self._claims[old]
+                excess -= 1
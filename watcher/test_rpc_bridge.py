@@ -113,6 +113,10 @@ async def test_full_pipeline():
             r=mock_r,
             s=mock_s
         )
+        if not result['success']:
+            print(f"    ✗ Verification {result['status']}: {result['revert_reason']}")
+            print(f"    Starknet Tx Hash: {result['tx_hash']}")
+            return False
         print(f"    ✓ Verification successful!")
         print(f"    Starknet Tx Hash: {result['tx_hash']}")
         print(f"    Verification Count: {result['verification_count']}")
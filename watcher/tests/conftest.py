@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Watcher modules are imported as top-level modules, like watcher.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
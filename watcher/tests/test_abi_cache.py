@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+import shutil
+
+import pytest
+
+from rpc_bridge import ABI_CACHE_SUFFIX, RpcBridge, contract_from_abi, load_abi_cache
+
+ARTIFACT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "..", "contracts", "target", "dev", "rift_verifier_Verifier.contract_class.json"
+)
+
+pytestmark = pytest.mark.skipif(not os.path.exists(ARTIFACT), reason="Verifier artifact not built")
+
+
+@pytest.fixture(scope="module")
+def artifact(tmp_path_factory):
+    path = tmp_path_factory.mktemp("artifact") / "Verifier.contract_class.json"
+    shutil.copy(ARTIFACT, path)
+    return str(path)
+
+
+def test_cache_holds_abi_and_class_hash(artifact):
+    from starknet_py.common import create_sierra_compiled_contract
+    from starknet_py.hash.sierra_class_hash import compute_sierra_class_hash
+
+    with open(artifact) as f:
+        compiled = f.read()
+    loaded = load_abi_cache(artifact)
+    assert loaded["class_hash"] == compute_sierra_class_hash(create_sierra_compiled_contract(compiled))
+    assert loaded["abi"] == json.loads(compiled)["abi"]
+
+    with open(artifact + ABI_CACHE_SUFFIX) as f:
+        assert int(json.load(f)["class_hash"], 16) == loaded["class_hash"]
+    assert load_abi_cache(artifact) == loaded
+
+
+def test_cache_is_rebuilt_when_stale_or_corrupt(artifact):
+    expected = load_abi_cache(artifact)
+    cache_path = artifact + ABI_CACHE_SUFFIX
+
+    with open(cache_path) as f:
+        cached = json.load(f)
+    cached["key"][2] += 1
+    cached["class_hash"] = "0x1"
+    with open(cache_path, "w") as f:
+        json.dump(cached, f)
+    assert load_abi_cache(artifact) == expected
+
+    with open(cache_path, "w") as f:
+        f.write("{not json")
+    assert load_abi_cache(artifact) == expected
+
+
+def load_verifier(artifact, deployed_class_hash, monkeypatch):
+    from starknet_py.contract import Contract
+
+    bridge = RpcBridge(rpc_url="http://127.0.0.1:1")
+    bridge.account = bridge.client
+    fetched = []
+
+    async def get_class_hash_at(address):
+        return deployed_class_hash
+
+    async def from_address(address, provider):
+        fetched.append(address)
+        return "fetched"
+
+    monkeypatch.setattr(bridge.client, "get_class_hash_at", get_class_hash_at)
+    monkeypatch.setattr(Contract, "from_address", staticmethod(from_address))
+
+    async def main():
+        try:
+            await bridge.load_verifier_contract("0x123", artifact)
+        finally:
+            await bridge.close()
+
+    asyncio.run(main())
+    return bridge.verifier_contract, fetched
+
+
+def test_matching_class_uses_cached_abi(artifact, monkeypatch):
+    contract, fetched = load_verifier(artifact, load_abi_cache(artifact)["class_hash"], monkeypatch)
+    assert fetched == []
+    assert contract.address == 0x123
+    assert "is_verified" in contract.functions
+
+
+def test_different_deployed_class_falls_back_to_node(artifact, monkeypatch):
+    contract, fetched = load_verifier(artifact, 0xdead, monkeypatch)
+    assert contract == "fetched"
+    assert fetched == ["0x123"]
+
+
+# Cairo 2 types the Verifier ABI doesn't use
+MINT_ABI = [
+    {"type": "struct", "name": "rift_verifier::executor::MintIntent", "members": [
+        {"name": "recipient", "type": "core::starknet::contract_address::ContractAddress"},
+        {"name": "asset_id", "type": "core::integer::u256"},
+        {"name": "amount", "type": "core::integer::u256"},
+        {"name": "bitcoin_tx_hash", "type": "core::felt252"},
+    ]},
+    {"type": "struct", "name": "core::integer::u256", "members": [
+        {"name": "low", "type": "core::integer::u128"}, {"name": "high", "type": "core::integer::u128"},
+    ]},
+    {"type": "function", "name": "mint_batch", "state_mutability": "external", "outputs": [],
+     "inputs": [{"name": "intents", "type": "core::array::Span::<rift_verifier::executor::MintIntent>"}]},
+    {"type": "function", "name": "totals", "state_mutability": "view",
+     "inputs": [{"name": "ids", "type": "core::array::Array::<(core::felt252, core::bool)>"}],
+     "outputs": [{"type": "(core::integer::u256, core::option::Option::<core::integer::u32>)"}]},
+]
+
+
+@pytest.mark.parametrize("abi", [None, MINT_ABI], ids=["verifier", "mint"])
+def test_shared_grammar_parses_like_starknet_py(artifact, abi, monkeypatch):
+    from starknet_py.abi.v2 import parser_transformer
+    from starknet_py.cairo.v2 import type_parser
+    from starknet_py.contract import Contract
+    from starknet_py.net.full_node_client import FullNodeClient
+
+    abi = abi or load_abi_cache(artifact)["abi"]
+    client = FullNodeClient(node_url="http://127.0.0.1:1")
+    shared = contract_from_abi("0x1", abi, client)
+    assert type_parser.parse is not parser_transformer.parse
+
+    monkeypatch.setattr(type_parser, "parse", parser_transformer.parse)
+    stock = Contract(address="0x1", abi=abi, provider=client, cairo_version=1)
+    assert shared.data.parsed_abi == stock.data.parsed_abi
@@ -0,0 +1,281 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from endpoint_pool import CLOSED, OPEN, RECOVERING, EndpointPool, NoHealthyEndpoint
+from rpc_bridge import pooled_rpc_http_client, starknet_endpoint_pool
+
+
+class NodeDown(Exception):
+    """Stands in for a connection error."""
+
+
+class BadRequest(Exception):
+    """Stands in for an error the node answered with."""
+
+
+def make_pool(urls=("a", "b"), **kwargs):
+    options = {"failure_threshold": 2, "open_seconds": 60, "hedge_min_delay": 0.05,
+               "is_node_error": lambda e: isinstance(e, NodeDown)}
+    options.update(kwargs)
+    return EndpointPool(list(urls), **options)
+
+
+def test_breaker_opens_after_repeated_failures():
+    pool = make_pool(urls=["a"])
+
+    def down(url):
+        raise NodeDown(url)
+
+    for _ in range(2):
+        with pytest.raises(NodeDown):
+            pool.call(down)
+    assert pool.endpoints[0].state == OPEN
+    with pytest.raises(NoHealthyEndpoint):
+        pool.call(lambda url: url)
+
+
+def test_fails_over_to_next_endpoint():
+    pool = make_pool()
+    calls = []
+
+    def fn(url):
+        calls.append(url)
+        if url == "a":
+            raise NodeDown(url)
+        return url
+
+    assert pool.call(fn) == "b"
+    assert calls == ["a", "b"]
+    assert pool.endpoints[0].failures == 1
+    assert pool.endpoints[1].latency is not None
+
+
+def test_recovery_ramps_weight_until_closed():
+    pool = make_pool(urls=["a"], open_seconds=0)
+    endpoint = pool.endpoints[0]
+    for _ in range(2):
+        pool.record_failure(endpoint, NodeDown())
+    assert endpoint.state == OPEN
+
+    assert pool.ranked() == [endpoint]
+    assert endpoint.state == RECOVERING
+    weights = [endpoint.weight]
+    for _ in range(3):
+        pool.record_success(endpoint, 0.01)
+        weights.append(endpoint.weight)
+    assert weights == [0.125, 0.25, 0.5, 1.0]
+    assert endpoint.state == CLOSED
+
+
+def test_recovering_endpoint_reopens_on_first_failure():
+    pool = make_pool(urls=["a"], open_seconds=0)
+    endpoint = pool.endpoints[0]
+    for _ in range(2):
+        pool.record_failure(endpoint, NodeDown())
+    pool.ranked()
+    pool.record_failure(endpoint, NodeDown())
+    assert endpoint.state == OPEN
+    assert endpoint.weight == 0.125
+
+
+def test_non_node_error_is_raised_without_failover():
+    pool = make_pool()
+    calls = []
+
+    def fn(url):
+        calls.append(url)
+        raise BadRequest(url)
+
+    with pytest.raises(BadRequest):
+        pool.call(fn)
+    assert calls == ["a"]
+    assert all(ep.failures == 0 for ep in pool.endpoints)
+
+
+def test_non_node_error_is_raised_without_failover_async():
+    pool = make_pool()
+    calls = []
+
+    async def fn(url):
+        calls.append(url)
+        raise BadRequest(url)
+
+    with pytest.raises(BadRequest):
+        asyncio.run(pool.call_async(fn))
+    assert calls == ["a"]
+
+
+def test_hedges_slow_read_to_second_endpoint():
+    pool = make_pool()
+
+    def fn(url):
+        if url == "a":
+            time.sleep(0.5)
+        return url
+
+    started = time.monotonic()
+    assert pool.call(fn, hedge=True) == "b"
+    assert time.monotonic() - started < 0.4
+
+
+def test_hedges_slow_read_to_second_endpoint_async():
+    pool = make_pool()
+
+    async def fn(url):
+        if url == "a":
+            await asyncio.sleep(0.5)
+        return url
+
+    started = time.monotonic()
+    assert asyncio.run(pool.call_async(fn, hedge=True)) == "b"
+    assert time.monotonic() - started < 0.4
+
+
+def test_hung_node_stops_leading_after_first_stall():
+    pool = make_pool(failure_threshold=100)
+    release = threading.Event()
+
+    def fn(url):
+        if url == "a":
+            release.wait()
+        else:
+            time.sleep(0.01)
+        return url
+
+    try:
+        durations = []
+        for _ in range(10):
+            started = time.monotonic()
+            assert pool.call(fn, hedge=True) == "b"
+            durations.append(time.monotonic() - started)
+        # Only the first read waits out a hedge delay on the hung node
+        assert max(durations) < 0.3
+        assert [ep.url for ep in pool.ranked()] == ["b", "a"]
+        assert len(pool.endpoints[0].pending) == 1
+    finally:
+        release.set()
+
+
+def test_hung_attempts_do_not_use_up_hedge_threads():
+    pool = make_pool(failure_threshold=100)
+    release = threading.Event()
+
+    def fn(url):
+        if url == "a":
+            release.wait()
+        return url
+
+    try:
+        # Force the hung node to the front every time
+        pool.ranked = lambda: list(pool.endpoints)
+        for _ in range(10):
+            started = time.monotonic()
+            assert pool.call(fn, hedge=True) == "b"
+            assert time.monotonic() - started < 0.3
+        assert len(pool.endpoints[0].pending) == 2
+    finally:
+        release.set()
+
+
+def test_cancelled_hedge_loser_counts_as_slow_async():
+    pool = make_pool()
+
+    async def fn(url):
+        if url == "a":
+            await asyncio.sleep(5)
+        return url
+
+    async def main():
+        for _ in range(3):
+            assert await pool.call_async(fn, hedge=True) == "b"
+
+    asyncio.run(main())
+    a, b = pool.endpoints
+    assert a.latency >= pool.hedge_min_delay > b.latency
+    assert a.pending == {} and a.failures == 0
+    assert pool.ranked() == [b, a]
+
+
+def test_write_timeout_fails_over_and_counts_against_node():
+    pool = make_pool()
+    calls = []
+
+    async def fn(url):
+        calls.append(url)
+        if url == "a":
+            await asyncio.sleep(5)
+        return url
+
+    assert asyncio.run(pool.call_async(fn, timeout=0.1)) == "b"
+    assert calls == ["a", "b"]
+    assert pool.endpoints[0].failures == 1
+
+
+def run_nodes(handlers, scenario):
+    async def main():
+        servers = []
+        for handler in handlers:
+            app = web.Application()
+            app.router.add_post("/", handler)
+            server = TestServer(app)
+            await server.start_server()
+            servers.append(server)
+        try:
+            return await scenario([str(server.make_url("/")) for server in servers])
+        finally:
+            for server in servers:
+                await server.close()
+
+    return asyncio.run(main())
+
+
+def test_pooled_client_times_out_stalled_transaction_submission():
+    seen = {"stalled": [], "healthy": []}
+
+    async def stalled(request):
+        body = await request.json()
+        seen["stalled"].append(body["method"])
+        await asyncio.sleep(5)
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"], "result": "0x0"})
+
+    async def healthy(request):
+        body = await request.json()
+        seen["healthy"].append(body["method"])
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"],
+                                  "result": {"transaction_hash": "0x1"}})
+
+    async def scenario(urls):
+        pool = starknet_endpoint_pool(urls)
+        pool.write_timeout = 0.1
+        client = pooled_rpc_http_client(pool)
+        return await client.call("addInvokeTransaction", {"invoke_transaction": {}})
+
+    assert run_nodes([stalled, healthy], scenario) == {"transaction_hash": "0x1"}
+    assert seen == {"stalled": ["starknet_addInvokeTransaction"],
+                    "healthy": ["starknet_addInvokeTransaction"]}
+
+
+def test_pooled_client_passes_rpc_errors_through():
+    from starknet_py.net.client_errors import ClientError
+
+    seen = []
+
+    async def rejecting(request):
+        body = await request.json()
+        seen.append(request.url.port)
+        return web.json_response({"jsonrpc": "2.0", "id": body["id"],
+                                  "error": {"code": 55, "message": "Account validation failed"}})
+
+    async def scenario(urls):
+        client = pooled_rpc_http_client(starknet_endpoint_pool(urls))
+        with pytest.raises(ClientError) as error:
+            await client.call("addInvokeTransaction", {"invoke_transaction": {}})
+        return error.value.code
+
+    assert run_nodes([rejecting, rejecting], scenario) == 55
+    assert len(seen) == 1
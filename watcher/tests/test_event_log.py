@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+
+from event_log import EventLog, FileSink
+
+
+class ListSink:
+    """Collects written records; optionally blocks until released."""
+
+    def __init__(self, blocked=False):
+        self.records = []
+        self.closed = False
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        if not blocked:
+            self.release.set()
+
+    def write_batch(self, lines):
+        self.entered.set()
+        self.release.wait()
+        self.records.extend(json.loads(line) for line in lines)
+
+    def close(self):
+        self.closed = True
+
+
+def test_records_reach_every_sink_as_ndjson():
+    first, second = ListSink(), ListSink()
+    log = EventLog([first, second], flush_interval=0.01)
+    log.emit("detection", txid="ab")
+    log.emit("submission", txid="ab", success=True)
+    log.close()
+
+    assert [r["event"] for r in first.records] == ["detection", "submission"]
+    assert first.records == second.records
+    assert first.records[1]["success"] is True
+    assert first.closed and second.closed
+
+
+def test_full_queue_drops_and_counts_records():
+    sink = ListSink(blocked=True)
+    log = EventLog([sink], queue_size=2, batch_size=1, flush_interval=0.01)
+    assert log.emit("detection", n=0)
+    # The writer now holds record 0 inside the sink, leaving the queue to us
+    assert sink.entered.wait(5)
+
+    results = [log.emit("detection", n=n) for n in range(1, 6)]
+    assert results == [True, True, False, False, False]
+    assert (log.emitted, log.dropped) == (3, 3)
+
+    sink.release.set()
+    log.close()
+    assert [r["n"] for r in sink.records] == [0, 1, 2]
+    assert not log.emit("detection", n=6)
+
+
+def test_counters_are_exact_across_threads():
+    log = EventLog([ListSink()], queue_size=100, flush_interval=0.01)
+
+    def burst():
+        for _ in range(500):
+            log.emit("detection")
+
+    threads = [threading.Thread(target=burst) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.close()
+    assert log.emitted + log.dropped == 8 * 500
+
+
+def test_close_gives_up_on_a_stuck_sink():
+    sink = ListSink(blocked=True)
+    log = EventLog([sink], queue_size=1, batch_size=1, flush_interval=0.01)
+    log.emit("detection", n=0)
+    assert sink.entered.wait(5)
+    log.emit("detection", n=1)
+
+    started = time.monotonic()
+    log.close(timeout=0.2)
+    assert time.monotonic() - started < 2
+    # The stuck writer still owns the sink
+    assert not sink.closed
+    sink.release.set()
+
+
+def test_file_sink_rotates_and_keeps_backups(tmp_path):
+    path = tmp_path / "events.ndjson"
+    sink = FileSink(str(path), max_bytes=100, backup_count=2)
+    for n in range(4):
+        sink.write_batch([json.dumps({"n": n, "pad": "x" * 100}) + "\n"])
+    sink.close()
+
+    assert path.read_text() == ""
+    assert json.loads((tmp_path / "events.ndjson.1").read_text())["n"] == 3
+    assert json.loads((tmp_path / "events.ndjson.2").read_text())["n"] == 2
+    assert not (tmp_path / "events.ndjson.3").exists()
+
+
+def test_payload_sampling_and_truncation():
+    log = EventLog([], payload_sample_rate=1.0, payload_max_chars=4)
+    assert log.payload("deadbeef") == "dead"
+    assert log.payload("ab") == "ab"
+
+    log.payload_max_chars = 0
+    assert log.payload("deadbeef") == "deadbeef"
+
+    log.payload_sample_rate = 0.0
+    assert log.payload("deadbeef") is None
+
+    log.payload_sample_rate = 0.5
+    kept = sum(log.payload("ab") is not None for _ in range(2000))
+    assert 800 < kept < 1200
+    log.close()
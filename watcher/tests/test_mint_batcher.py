@@ -0,0 +1,358 @@
+import asyncio
+
+import pytest
+
+from endpoint_pool import NoHealthyEndpoint
+from mint_batcher import WRAPPED_BTC, MintBatcher, MintIntent, MintStore, parse_mint_intent
+from rpc_bridge import TX_ACCEPTED, TX_REVERTED
+
+RECIPIENT = 0x6b6ccfb3409191fa7577a1ec3903e0387218f0ddd35f2c6c11100c7ca033e5
+
+
+class Events:
+    def __init__(self):
+        self.records = []
+
+    def emit(self, event, **fields):
+        self.records.append((event, fields))
+
+    def of(self, event):
+        return [fields for name, fields in self.records if name == event]
+
+
+class Client:
+    def __init__(self, bridge):
+        self.bridge = bridge
+
+    async def get_block_number(self):
+        return self.bridge.block
+
+
+class FakeBridge:
+    """
+    Verifier events, Executor claims and mint_batch receipts kept in memory.
+
+    Receipt steps follow a simple model: a fixed cost per transaction, plus
+    a cost per deposit and per recipient run.
+    """
+
+    def __init__(self):
+        self.client = Client(self)
+        self.block = 10
+        self.events = []  # (block, tx_hash)
+        self.claimed = set()
+        self.bad = set()
+        self.batches = []
+        self.down = False
+        # Raised by the next submissions, e.g. a nonce or fee estimation error
+        self.errors = []
+
+    def verify(self, *tx_hashes):
+        self.block += 1
+        self.events.extend((self.block, tx_hash) for tx_hash in tx_hashes)
+
+    async def get_verified_events(self, from_block, to_block=None):
+        to_block = self.block if to_block is None else to_block
+        return [h for block, h in self.events if from_block <= block <= to_block], to_block
+
+    async def is_claimed(self, tx_hash):
+        return tx_hash in self.claimed
+
+    async def is_verified(self, tx_hash):
+        return any(h == tx_hash for _, h in self.events)
+
+    async def submit_mint_batch(self, intents):
+        if self.down:
+            raise NoHealthyEndpoint("all nodes down")
+        if self.errors:
+            raise self.errors.pop(0)
+        keys = [(i["asset_id"], i["recipient"]) for i in intents]
+        assert keys == sorted(keys)
+        self.batches.append([i["bitcoin_tx_hash"] for i in intents])
+        hashes = {i["bitcoin_tx_hash"] for i in intents}
+        future = asyncio.get_running_loop().create_future()
+        if hashes & (self.bad | self.claimed):
+            future.set_result({"tx_hash": "0x2", "status": TX_REVERTED, "revert_reason": "Already claimed"})
+        else:
+            self.claimed |= hashes
+            runs = len({key for key in keys})
+            future.set_result({"tx_hash": "0x1", "status": TX_ACCEPTED, "revert_reason": None,
+                               "execution_resources": {"steps": 5000 + 600 * len(intents) + 300 * runs}})
+        return future
+
+
+def intent(tx_hash, recipient=1, asset_id=WRAPPED_BTC, amount=1000):
+    return MintIntent(recipient, asset_id, amount, tx_hash)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "mints.db")
+
+
+def batcher(bridge, db_path, owner="local", **kwargs):
+    options = {"max_batch_size": 64, "max_delay": 0.05, "poll_interval": 0.01, "events": Events()}
+    options.update(kwargs)
+    return MintBatcher(bridge, MintStore(db_path, owner), **options)
+
+
+async def settle(mint, timeout=5):
+    """Wait until nothing is ready to mint or in flight."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while mint._ready or mint._in_flight is not None:
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_parses_btc_and_rune_mints():
+    recipient = f"{RECIPIENT:064x}"
+    btc = parse_mint_intent("aabb52494654" + "01" + recipient + "00000000000f4240", 2 ** 252 + 5)
+    assert btc == MintIntent(RECIPIENT, WRAPPED_BTC, 1_000_000, 5)
+
+    rune = parse_mint_intent("52494654" + "02" + recipient + "0000000000000001" + "0" * 31 + "7", 9)
+    assert rune == MintIntent(RECIPIENT, 7, 1, 9)
+
+
+@pytest.mark.parametrize("payload", [
+    "52494654" + "01" + f"{RECIPIENT:064x}" + "00000000000f42",      # truncated amount
+    "52494654" + "ff" + f"{RECIPIENT:064x}" + "00000000000f4240",    # unknown action
+    "52494654" + "01" + "0" * 64 + "00000000000f4240",               # zero recipient
+    "52494654" + "01" + f"{RECIPIENT:064x}" + "0" * 16,              # zero amount
+    "52494654" + "02" + f"{RECIPIENT:064x}" + "0" * 15 + "1" + "0" * 32,  # rune id 0
+    "deadbeef",
+])
+def test_rejects_malformed_payloads(payload):
+    assert parse_mint_intent(payload, 1) is None
+
+
+def test_mints_verified_deposits_in_sorted_batches(db_path):
+    bridge = FakeBridge()
+
+    async def main():
+        mint = batcher(bridge, db_path, max_batch_size=8)
+        await mint.start()
+        for tx_hash in range(20):
+            mint.expect(intent(tx_hash, recipient=20 - tx_hash % 5))
+        mint.expect(intent(99))
+        bridge.verify(*range(20))
+        await asyncio.sleep(0.05)
+        await settle(mint)
+        await mint.close()
+        return mint
+
+    mint = asyncio.run(main())
+    assert sorted(h for batch in bridge.batches for h in batch) == list(range(20))
+    assert max(len(batch) for batch in bridge.batches) == 8
+    assert mint.stats["deposits"] == 20
+    assert [fields["deposits"] for fields in mint.events.of("mint_batch")] == \
+        [len(batch) for batch in bridge.batches]
+    # The unverified deposit is still pending after shutdown
+    pending, _ = MintStore(db_path).load()
+    assert pending == [(intent(99), False)]
+
+
+def test_bisects_a_reverted_batch_down_to_the_bad_deposit(db_path):
+    bridge = FakeBridge()
+    bridge.bad = {5}
+
+    async def main():
+        mint = batcher(bridge, db_path, max_batch_size=8)
+        await mint.start()
+        for tx_hash in range(8):
+            mint.expect(intent(tx_hash))
+        bridge.verify(*range(8))
+        await asyncio.sleep(0.05)
+        await settle(mint)
+        await mint.close()
+        return mint
+
+    mint = asyncio.run(main())
+    assert mint.stats["deposits"] == 7
+    assert [fields["bitcoin_tx_hash"] for fields in mint.events.of("mint_failed")] == [hex(5)]
+    assert bridge.claimed == set(range(8)) - {5}
+    assert MintStore(db_path).load()[0] == []
+
+
+def test_larger_batches_spend_fewer_steps_per_deposit(tmp_path):
+    def run(batch_size):
+        bridge = FakeBridge()
+
+        async def main():
+            mint = batcher(bridge, str(tmp_path / f"mints-{batch_size}.db"), max_batch_size=batch_size)
+            await mint.start()
+            for tx_hash in range(32):
+                mint.expect(intent(tx_hash, recipient=1 + tx_hash % 4))
+            bridge.verify(*range(32))
+            await asyncio.sleep(0.05)
+            await settle(mint)
+            await mint.close()
+            return mint
+
+        return asyncio.run(main()).steps_per_deposit
+
+    assert run(32) < run(1) / 5
+
+
+def test_restart_resumes_from_the_store(db_path):
+    bridge = FakeBridge()
+
+    async def crash():
+        mint = batcher(bridge, db_path, max_delay=60)
+        await mint.start()
+        for tx_hash in (1, 2, 3):
+            mint.expect(intent(tx_hash))
+        bridge.verify(1, 2)
+        await asyncio.sleep(0.05)
+        assert len(mint._ready) == 2
+        # Deposit 1 got minted just before the process died
+        bridge.claimed.add(1)
+        mint._task.cancel()
+
+    asyncio.run(crash())
+    # Verified while the watcher was down
+    bridge.verify(3)
+
+    async def restart():
+        mint = batcher(bridge, db_path)
+        await mint.start()
+        await asyncio.sleep(0.05)
+        await settle(mint)
+        await mint.close()
+
+    asyncio.run(restart())
+    assert bridge.batches == [[2, 3]]
+    assert MintStore(db_path).load()[0] == []
+
+
+def test_shutdown_with_nodes_down_keeps_verified_deposits(db_path):
+    bridge = FakeBridge()
+
+    async def main():
+        mint = batcher(bridge, db_path, max_delay=60)
+        await mint.start()
+        mint.expect(intent(1))
+        bridge.verify(1)
+        await asyncio.sleep(0.05)
+        bridge.down = True
+        await mint.close()
+
+    asyncio.run(main())
+    assert MintStore(db_path).load()[0] == [(intent(1), True)]
+
+
+def test_discarded_intents_are_forgotten(db_path):
+    async def main():
+        mint = batcher(FakeBridge(), db_path)
+        await mint.start()
+        mint.expect(intent(1))
+        assert await mint.discard(1)
+        await mint.close()
+
+    asyncio.run(main())
+    assert MintStore(db_path).load()[0] == []
+
+
+def test_discard_keeps_a_deposit_verified_by_another_submission(db_path):
+    bridge = FakeBridge()
+
+    async def main():
+        mint = batcher(bridge, db_path)
+        await mint.start()
+        mint.expect(intent(1))
+        # A second submission of the same tx reverts with 'Already verified'
+        bridge.verify(1)
+        assert not await mint.discard(1)
+        await asyncio.sleep(0.05)
+        await settle(mint)
+        await mint.close()
+        return mint
+
+    mint = asyncio.run(main())
+    assert bridge.claimed == {1}
+    assert mint.stats["deposits"] == 1
+
+
+def test_submission_errors_requeue_instead_of_dropping(db_path):
+    bridge = FakeBridge()
+    # Two failures for the whole batch, then two more for its halves
+    bridge.errors = [RuntimeError("Invalid transaction nonce") for _ in range(4)]
+
+    async def main():
+        mint = batcher(bridge, db_path)
+        await mint.start()
+        mint.expect(intent(1))
+        mint.expect(intent(2))
+        bridge.verify(1, 2)
+        await asyncio.sleep(0.05)
+        await settle(mint)
+        await mint.close()
+        return mint
+
+    mint = asyncio.run(main())
+    assert bridge.claimed == {1, 2}
+    assert mint.stats["failed"] == 0
+    assert mint.events.of("mint_failed") == []
+    assert MintStore(db_path).load()[0] == []
+
+
+def test_pending_errors_keep_the_deposit_in_the_store(db_path):
+    bridge = FakeBridge()
+    bridge.errors = [RuntimeError("fee estimation failed")]
+
+    async def main():
+        mint = batcher(bridge, db_path, max_delay=0, poll_interval=60)
+        await mint.start()
+        mint.expect(intent(1))
+        bridge.verify(1)
+        await mint._collect()
+        await mint._mint(mint._take_batch())
+        assert [i for _, i in mint._ready] == [intent(1)]
+        assert not mint._due()
+        mint._task.cancel()
+
+    asyncio.run(main())
+    assert MintStore(db_path).load()[0] == [(intent(1), True)]
+
+
+def test_revert_of_an_already_minted_deposit_is_not_a_failure(db_path):
+    bridge = FakeBridge()
+
+    async def main():
+        mint = batcher(bridge, db_path)
+        await mint.start()
+        mint.expect(intent(1))
+        bridge.verify(1)
+        # Minted by another instance in the meantime
+        bridge.claimed.add(1)
+        await asyncio.sleep(0.05)
+        await settle(mint)
+        await mint.close()
+        return mint
+
+    mint = asyncio.run(main())
+    assert bridge.batches == [[1]]
+    assert mint.events.of("mint_failed") == []
+    assert MintStore(db_path).load()[0] == []
+
+
+def test_survivor_adopts_intents_of_a_departed_instance(db_path):
+    bridge = FakeBridge()
+    gone = MintStore(db_path, "gone")
+    gone.add(intent(1))
+    gone.add(intent(2))
+    gone.mark_verified([1], bridge.block + 1)
+    # Deposit 2 is verified after "gone" last scanned, before the survivor's start
+    bridge.verify(2)
+    bridge.block += 5
+
+    async def main():
+        mint = batcher(bridge, db_path, owner="survivor")
+        await mint.start()
+        await mint.adopt(["survivor"])
+        await asyncio.sleep(0.05)
+        await settle(mint)
+        await mint.close()
+
+    asyncio.run(main())
+    assert sorted(h for batch in bridge.batches for h in batch) == [1, 2]
+    assert MintStore(db_path, "gone").load() == ([], None)
@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+from starknet_py.net.client_errors import ClientError
+
+from rpc_bridge import INVALID_TRANSACTION_NONCE, RpcBridge
+
+
+class FakeNode:
+    """Accepts an account's transactions only in nonce order."""
+
+    def __init__(self, nonce=5):
+        self.nonce = nonce
+        self.nonce_reads = 0
+        self.sent = []
+
+    async def get_nonce(self):
+        self.nonce_reads += 1
+        return self.nonce
+
+    def function(self, name):
+        async def invoke_v3(nonce=None, auto_estimate=False, **kwargs):
+            # Fee estimation and signing take a while, letting other submissions interleave
+            await asyncio.sleep(0.01)
+            if nonce != self.nonce:
+                raise ClientError(message="Invalid transaction nonce", code=INVALID_TRANSACTION_NONCE)
+            self.nonce += 1
+            self.sent.append((name, nonce))
+            return SimpleNamespace(hash=len(self.sent))
+
+        return SimpleNamespace(invoke_v3=invoke_v3)
+
+
+def run_bridge(node, scenario):
+    async def main():
+        bridge = RpcBridge(rpc_url="http://127.0.0.1:1")
+        bridge.account = node
+        bridge.verifier_contract = SimpleNamespace(
+            functions={"verify_secp256k1_signature": node.function("verify")})
+        bridge.executor_contract = SimpleNamespace(functions={"mint_batch": node.function("mint")})
+        bridge.receipt_tracker.track = lambda tx_hash: tx_hash
+        try:
+            return await scenario(bridge)
+        finally:
+            await bridge.close()
+
+    return asyncio.run(main())
+
+
+def submit(bridge, tx_hash):
+    return bridge.submit_signature(tx_hash, 1, 2, 3, 4, 5)
+
+
+def test_overlapping_submissions_get_consecutive_nonces():
+    node = FakeNode()
+
+    async def scenario(bridge):
+        return await asyncio.gather(
+            submit(bridge, 1), submit(bridge, 2), bridge.submit_mint_batch([{"bitcoin_tx_hash": 1}])
+        )
+
+    assert sorted(run_bridge(node, scenario)) == [1, 2, 3]
+    assert [nonce for _, nonce in node.sent] == [5, 6, 7]
+    assert sorted(name for name, _ in node.sent) == ["mint", "verify", "verify"]
+    assert node.nonce_reads == 1
+
+
+def test_resyncs_after_another_sender_used_the_nonce():
+    node = FakeNode()
+
+    async def scenario(bridge):
+        await submit(bridge, 1)
+        # The same account sent a transaction from somewhere else
+        node.nonce += 1
+        await submit(bridge, 2)
+
+    run_bridge(node, scenario)
+    assert node.sent == [("verify", 5), ("verify", 7)]
+    assert node.nonce_reads == 2
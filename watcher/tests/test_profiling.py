@@ -0,0 +1,76 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from profiling import OnDemandProfiler
+
+pytestmark = pytest.mark.skipif(not OnDemandProfiler().supported, reason="needs SIGPROF and setitimer")
+
+
+def read_collapsed(path):
+    samples = {}
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            samples[stack] = int(count)
+    return samples
+
+
+def test_wall_clock_samples_include_blocked_threads(tmp_path):
+    release = threading.Event()
+
+    def wait_for_node():
+        release.wait()
+
+    worker = threading.Thread(target=wait_for_node, name="blocked-worker")
+    worker.start()
+    profiler = OnDemandProfiler(output_dir=str(tmp_path), window_seconds=0, sample_interval=0.005)
+    try:
+        profiler.start()
+        with profiler.stage("sleep"):
+            time.sleep(0.3)
+        prefix = profiler.stop()
+    finally:
+        release.set()
+        worker.join()
+
+    wall = read_collapsed(prefix + ".collapsed")
+    blocked = [stack for stack in wall if stack.startswith("blocked-worker;")]
+    assert blocked and any("wait_for_node" in stack for stack in blocked)
+    assert sum(wall[stack] for stack in blocked) > 10
+    assert not any("profile-sampler" in stack for stack in wall)
+
+    # CPU-time samples go to their own file
+    assert isinstance(read_collapsed(prefix + ".cpu.collapsed"), dict)
+    assert not profiler.active
+    assert not any(t.name == "profile-sampler" for t in threading.enumerate())
+
+
+def test_toggle_signal_runs_off_the_main_thread_and_logs_write_errors(tmp_path, capsys):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    profiler = OnDemandProfiler(output_dir=str(blocker / "profiles"), window_seconds=0, sample_interval=0.005)
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        profiler.install()
+        os.kill(os.getpid(), signal.SIGUSR1)
+        deadline = time.monotonic() + 5
+        while not profiler.active and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert profiler.active
+
+        # Writing fails on the toggle thread; the handler itself never raises
+        os.kill(os.getpid(), signal.SIGUSR1)
+        while profiler.active and time.monotonic() < deadline:
+            time.sleep(0.01)
+        deadline = time.monotonic() + 5
+        while "Writing the profile failed" not in capsys.readouterr().err and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert time.monotonic() < deadline
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+        profiler.finish()
+    assert not profiler.active
@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from rpc_bridge import RECEIPT_BATCH_REJECTIONS, TX_ACCEPTED, TX_REJECTED, TX_REVERTED, TXN_HASH_NOT_FOUND, ReceiptTracker
+
+
+class FakeNode:
+    """JSON-RPC endpoint answering receipt and status requests from canned state."""
+
+    def __init__(self, receipts=None, statuses=None, batches=True):
+        self.receipts = receipts or {}
+        self.statuses = statuses or {}
+        self.batches = batches
+        self.requests = []
+        # Raw bodies to send instead of a proper answer, one per request
+        self.faults = []
+
+    def answer(self, request):
+        tx_hash = int(request["params"]["transaction_hash"], 16)
+        if request["method"] == "starknet_getTransactionReceipt":
+            result = self.receipts.get(tx_hash)
+        else:
+            result = self.statuses.get(tx_hash)
+        if result is None:
+            return {"jsonrpc": "2.0", "id": request["id"],
+                    "error": {"code": TXN_HASH_NOT_FOUND, "message": "Transaction hash not found"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": result}
+
+    async def handle(self, http_request):
+        body = await http_request.json()
+        self.requests.append(body)
+        if self.faults:
+            return web.Response(text=self.faults.pop(0), content_type="application/json")
+        if isinstance(body, list):
+            if not self.batches:
+                return web.json_response({"jsonrpc": "2.0", "id": None,
+                                          "error": {"code": -32600, "message": "Batches not supported"}})
+            return web.json_response([self.answer(item) for item in body])
+        return web.json_response(self.answer(body))
+
+
+def run_tracker(node, scenario, **kwargs):
+    async def main():
+        app = web.Application()
+        app.router.add_post("/", node.handle)
+        server = TestServer(app)
+        await server.start_server()
+        options = {"min_interval": 0.01, "max_interval": 0.05}
+        options.update(kwargs)
+        tracker = ReceiptTracker(rpc_url=str(server.make_url("/")), **options)
+        try:
+            return await scenario(tracker)
+        finally:
+            await tracker.close()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def accepted(resources=None):
+    return {"execution_status": "SUCCEEDED", "finality_status": "ACCEPTED_ON_L2",
+            "execution_resources": resources or {"steps": 100}}
+
+
+def test_resolves_batch_in_one_request_per_method():
+    node = FakeNode(
+        receipts={
+            1: accepted(),
+            2: {"execution_status": "REVERTED", "finality_status": "ACCEPTED_ON_L2",
+                "revert_reason": "Already verified"},
+        },
+        statuses={3: {"finality_status": "REJECTED"}},
+    )
+
+    async def scenario(tracker):
+        return await asyncio.gather(*(tracker.track(h) for h in (1, 2, 3)))
+
+    first, second, third = run_tracker(node, scenario)
+    assert first["status"] == TX_ACCEPTED
+    assert first["execution_resources"] == {"steps": 100}
+    assert second["status"] == TX_REVERTED
+    assert second["revert_reason"] == "Already verified"
+    assert third["status"] == TX_REJECTED
+    # One receipt batch, one status batch for the hash without a receipt
+    assert [len(body) for body in node.requests] == [3, 1]
+
+
+def test_keeps_polling_after_malformed_responses():
+    node = FakeNode(receipts={1: accepted()})
+    node.faults = ["not json", json.dumps([{"jsonrpc": "2.0", "id": 0}])]
+
+    async def scenario(tracker):
+        return await asyncio.wait_for(tracker.track(1), timeout=5)
+
+    assert run_tracker(node, scenario)["status"] == TX_ACCEPTED
+    assert len(node.requests) == 3
+
+
+def test_pending_hashes_expire_while_polls_fail():
+    node = FakeNode()
+    node.faults = ["not json"] * 1000
+
+    async def scenario(tracker):
+        return await asyncio.wait_for(tracker.track(1), timeout=5)
+
+    result = run_tracker(node, scenario, timeout=0.1)
+    assert result["status"] == TX_REJECTED
+    assert "No receipt" in result["revert_reason"]
+
+
+def test_falls_back_to_single_calls_without_batch_support():
+    node = FakeNode(receipts={1: accepted(), 2: accepted()}, batches=False)
+
+    async def scenario(tracker):
+        return await asyncio.gather(tracker.track(1), tracker.track(2))
+
+    results = run_tracker(node, scenario)
+    assert [r["status"] for r in results] == [TX_ACCEPTED, TX_ACCEPTED]
+    assert isinstance(node.requests[0], list)
+    assert all(isinstance(body, dict) for body in node.requests[1:])
+
+
+def test_batching_survives_a_transient_error():
+    node = FakeNode(receipts={1: accepted(), 2: accepted()})
+    node.faults = [json.dumps({"jsonrpc": "2.0", "id": None,
+                               "error": {"code": -32603, "message": "upstream timed out"}})]
+
+    async def scenario(tracker):
+        first = await tracker._batch_call("starknet_getTransactionReceipt", [1, 2])
+        second = await tracker._batch_call("starknet_getTransactionReceipt", [1, 2])
+        return first, second
+
+    first, second = run_tracker(node, scenario)
+    assert [r["result"]["finality_status"] for r in first + second] == ["ACCEPTED_ON_L2"] * 4
+    # Batch, two single calls, then batches again
+    assert [isinstance(body, list) for body in node.requests] == [True, False, False, True]
+
+
+def test_stops_batching_after_repeated_rejections():
+    node = FakeNode(receipts={1: accepted()}, batches=False)
+
+    async def scenario(tracker):
+        for _ in range(RECEIPT_BATCH_REJECTIONS + 1):
+            await tracker._batch_call("starknet_getTransactionReceipt", [1])
+
+    run_tracker(node, scenario)
+    batches = [isinstance(body, list) for body in node.requests]
+    assert batches == [True, False] * RECEIPT_BATCH_REJECTIONS + [False]
+
+
+def test_close_fails_pending_futures():
+    node = FakeNode()
+
+    async def scenario(tracker):
+        future = tracker.track(1)
+        await tracker.close()
+        return future.exception()
+
+    assert isinstance(run_tracker(node, scenario), RuntimeError)
@@ -0,0 +1,200 @@
+import sqlite3
+import time
+
+import pytest
+
+from sharding import HashRing, LocalClaims, ShardCoordinator
+
+TXIDS = [f"{n:064x}" for n in range(300)]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "shards.db")
+
+
+@pytest.fixture
+def coordinators(db_path):
+    created = []
+
+    def make(instance_id, lease_seconds=15.0):
+        coordinator = ShardCoordinator(db_path, instance_id=instance_id, lease_seconds=lease_seconds)
+        created.append(coordinator)
+        return coordinator
+
+    yield make
+    for coordinator in created:
+        coordinator.leave()
+
+
+def test_ring_splits_keys_and_moves_only_the_departed_share():
+    full = HashRing(["a", "b", "c"])
+    owners = {txid: full.owner(txid) for txid in TXIDS}
+    counts = {member: list(owners.values()).count(member) for member in "abc"}
+    assert all(count > len(TXIDS) / 6 for count in counts.values())
+
+    survivors = HashRing(["a", "b"])
+    for txid, owner in owners.items():
+        if owner != "c":
+            assert survivors.owner(txid) == owner
+        else:
+            assert survivors.owner(txid) in ("a", "b")
+
+    assert HashRing(["b", "a", "c"]).owner(TXIDS[0]) == owners[TXIDS[0]]
+    assert HashRing([]).owner(TXIDS[0]) is None
+
+
+def test_heartbeat_reports_membership_changes(coordinators):
+    a = coordinators("a")
+    # A new coordinator's ring already holds itself
+    assert not a.heartbeat()
+
+    b = coordinators("b")
+    b.heartbeat()
+    assert a.heartbeat()
+    assert a.ring.members == ["a", "b"]
+    assert all(a.owns(txid) != b.owns(txid) for txid in TXIDS)
+
+
+def test_claim_is_exclusive_until_released(coordinators):
+    a, b = coordinators("a"), coordinators("b")
+    a.heartbeat()
+    b.heartbeat()
+    txid = TXIDS[0]
+
+    assert a.claim(txid, "00") == 1
+    assert a.claim(txid) is None
+    assert b.claim(txid) is None
+    assert a.holds(txid, 1)
+    assert not b.holds(txid, 1)
+
+    a.release(txid, 1)
+    assert not a.holds(txid, 1)
+    assert b.claim(txid) == 2
+    b.complete(txid, 2)
+    assert not b.holds(txid, 2)
+    assert a.claim(txid) is None
+
+
+def test_stale_epoch_cannot_finish_a_newer_claim(coordinators):
+    a = coordinators("a")
+    a.heartbeat()
+    txid = TXIDS[0]
+
+    assert a.claim(txid) == 1
+    a.release(txid, 1)
+    assert a.claim(txid) == 2
+    # The first attempt settles late; it must not touch the retry's claim
+    assert not a.holds(txid, 1)
+    a.complete(txid, 1)
+    a.release(txid, 1)
+    assert a.holds(txid, 2)
+
+
+def test_expired_claims_are_adopted_with_a_new_epoch(coordinators):
+    a = coordinators("a", lease_seconds=0.2)
+    b = coordinators("b", lease_seconds=0.2)
+    a.heartbeat()
+    b.heartbeat()
+    owned = [txid for txid in TXIDS[:20] if a.owns(txid)]
+    for txid in owned:
+        assert a.claim(txid, f"hex-{txid}") == 1
+
+    # a stalls past its lease while b keeps renewing
+    time.sleep(0.3)
+    assert b.heartbeat()
+    assert b.ring.members == ["b"]
+
+    adopted = b.adopt_orphans()
+    assert sorted(adopted) == sorted((txid, f"hex-{txid}", 2) for txid in owned)
+    assert not any(a.holds(txid, 1) for txid in owned)
+    assert b.adopt_orphans() == []
+
+
+def test_background_renewal_keeps_a_slow_instance_alive(coordinators):
+    a = coordinators("a", lease_seconds=0.3)
+    b = coordinators("b", lease_seconds=0.3)
+    a.start()
+    a.heartbeat()
+    a.claim(TXIDS[0], "00")
+
+    # a's poll loop never calls heartbeat() again
+    time.sleep(0.7)
+    b.heartbeat()
+    assert b.ring.members == ["a", "b"]
+    assert b.adopt_orphans() == []
+    assert a.holds(TXIDS[0], 1)
+
+
+def test_restart_with_same_instance_id_resumes_own_claims(coordinators):
+    a = coordinators("a")
+    a.start()
+    a.heartbeat()
+    assert a.claim(TXIDS[0], "00") == 1
+    assert a.claim(TXIDS[1], "01") == 1
+    a.complete(TXIDS[1], 1)
+
+    # The process dies without leave(); a new one starts under the same id
+    restarted = coordinators("a")
+    restarted.start()
+    restarted.heartbeat()
+    assert restarted.adopt_orphans() == [(TXIDS[0], "00", 2)]
+    assert restarted.adopt_orphans() == []
+    assert restarted.holds(TXIDS[0], 2)
+    assert not a.holds(TXIDS[0], 1)
+
+
+def test_calls_after_leave_are_no_ops(coordinators):
+    a = coordinators("a")
+    a.start()
+    a.heartbeat()
+    a.claim(TXIDS[0])
+    a.leave()
+
+    assert not a.holds(TXIDS[0], 1)
+    assert a.claim(TXIDS[1]) is None
+    assert a.adopt_orphans() == []
+    a.complete(TXIDS[0], 1)
+    a.release(TXIDS[0], 1)
+    a.renew_lease()
+    a.leave()
+
+
+def test_adds_epoch_column_to_existing_database(db_path):
+    db = sqlite3.connect(db_path)
+    db.executescript(
+        "CREATE TABLE claims (txid TEXT PRIMARY KEY, owner TEXT NOT NULL, state TEXT NOT NULL, "
+        "tx_hex TEXT, updated_at REAL NOT NULL);"
+        "INSERT INTO claims VALUES ('t', 'gone', 'claimed', '00', 0);"
+    )
+    db.commit()
+    db.close()
+
+    a = ShardCoordinator(db_path, instance_id="a")
+    try:
+        a.heartbeat()
+        assert a.adopt_orphans() == [("t", "00", 1)]
+    finally:
+        a.leave()
+
+
+def test_local_claims_submit_each_txid_once():
+    claims = LocalClaims(retention=2)
+    txid = TXIDS[0]
+
+    assert claims.claim(txid) == 1
+    # Still in the mempool on the next poll while the first submission is pending
+    assert claims.claim(txid) is None
+    claims.release(txid, 1)
+    assert claims.claim(txid) == 2
+    claims.complete(txid, 1)
+    assert claims.holds(txid, 2)
+    claims.complete(txid, 2)
+    assert claims.claim(txid) is None
+
+    # Old settled txids are forgotten, in-flight ones never are
+    assert claims.claim(TXIDS[1]) == 1
+    for other in TXIDS[2:5]:
+        claims.complete(other, claims.claim(other))
+    assert claims.claim(txid) == 1
+    assert claims.holds(TXIDS[1], 1)